@@ -4,9 +4,16 @@
 import argparse
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+try:
+    # Optional: several times faster on the per-line parses below
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 
 def _extract_text_from_codex_content(content):
     if isinstance(content, str):
@@ -63,7 +70,7 @@ def _codex_has_event_messages(input_path):
     with open(input_path, "r", encoding="utf-8") as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
             except json.JSONDecodeError:
                 continue
             if data.get("type") != "event_msg":
@@ -82,47 +89,59 @@ def _format_size(size_bytes):
     return f"{size_bytes}B"
 
 
-def _extract_preview(jsonl_path, use_event_msgs):
-    timestamp = None
-    first_message = ""
-    user_count = 0
-    assistant_count = 0
+def _extract_preview(jsonl_path, use_event_msgs=None):
+    """Summarize a session for the picker.
+
+    With use_event_msgs=None the event_msg/response_item choice that
+    _codex_has_event_messages would make is decided in the same pass, so the
+    file is read once.
+    """
+    # Tallies per source: [timestamp, first_message, user_count, assistant_count]
+    events = [None, "", 0, 0]
+    responses = [None, "", 0, 0]
 
     try:
-        with open(jsonl_path, "r", encoding="utf-8") as f:
+        with open(jsonl_path, "rb") as f:
             for line in f:
+                # Every record of interest has a "...message" type; tool calls,
+                # reasoning and turn context are skipped without being parsed
+                if b'message"' not in line:
+                    continue
                 try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
+                    data = _json_loads(line)
+                except ValueError:
                     continue
                 record_type = data.get("type", "")
                 payload = data.get("payload", {})
                 payload_type = payload.get("type")
 
                 if record_type == "event_msg" and payload_type in ("user_message", "agent_message"):
-                    if payload_type == "user_message":
-                        user_count += 1
-                    else:
-                        assistant_count += 1
-                    if timestamp is None:
-                        timestamp = data.get("timestamp", "")
-                    if not first_message:
-                        first_message = payload.get("message", "").strip()
+                    tally = events
+                    role = "user" if payload_type == "user_message" else "assistant"
+                    text = payload.get("message", "")
+                elif record_type == "response_item" and payload_type == "message" and use_event_msgs is not True:
+                    tally = responses
+                    role = payload.get("role", "")
+                    text = None
+                else:
                     continue
 
-                if record_type == "response_item" and payload_type == "message" and not use_event_msgs:
-                    role = payload.get("role", "")
-                    if role == "user":
-                        user_count += 1
-                    elif role == "assistant":
-                        assistant_count += 1
-                    if timestamp is None:
-                        timestamp = data.get("timestamp", "")
-                    if not first_message:
-                        first_message = _extract_text_from_codex_content(payload.get("content", [])).strip()
-    except (OSError, UnicodeDecodeError):
+                if role == "user":
+                    tally[2] += 1
+                elif role == "assistant":
+                    tally[3] += 1
+                if tally[0] is None:
+                    tally[0] = data.get("timestamp", "")
+                if not tally[1]:
+                    if text is None:
+                        text = _extract_text_from_codex_content(payload.get("content", []))
+                    tally[1] = text.strip()
+    except OSError:
         pass
 
+    if use_event_msgs is None:
+        use_event_msgs = events[2] + events[3] > 0
+    timestamp, first_message, user_count, assistant_count = events if use_event_msgs else responses
     return {
         "timestamp": timestamp or "",
         "first_message": first_message,
@@ -132,15 +151,20 @@ def _extract_preview(jsonl_path, use_event_msgs):
 
 
 def _extract_preview_messages(jsonl_path, count=3):
-    """Extract first N user/assistant messages for preview display."""
-    messages = []
-    use_event_msgs = _codex_has_event_messages(jsonl_path)
+    """Extract first N user/assistant messages for preview display.
+
+    event_msg and response_item messages are collected in the same pass, so
+    the file is read once instead of first by _codex_has_event_messages.
+    """
+    events = []
+    responses = []
+    saw_event = False
 
     try:
         with open(jsonl_path, "r", encoding="utf-8") as f:
             for line in f:
                 try:
-                    data = json.loads(line)
+                    data = _json_loads(line)
                 except json.JSONDecodeError:
                     continue
 
@@ -149,22 +173,23 @@ def _extract_preview_messages(jsonl_path, count=3):
                 payload_type = payload.get("type")
 
                 if record_type == "event_msg" and payload_type in ("user_message", "agent_message"):
+                    saw_event = True
                     role = "user" if payload_type == "user_message" else "assistant"
                     text = payload.get("message", "").strip()
                     if text:
-                        messages.append({"role": role, "text": text})
-                elif record_type == "response_item" and payload_type == "message" and not use_event_msgs:
+                        events.append({"role": role, "text": text})
+                    if len(events) >= count:
+                        break
+                elif record_type == "response_item" and payload_type == "message" and len(responses) < count:
                     role = payload.get("role", "")
                     text = _extract_text_from_codex_content(payload.get("content", [])).strip()
                     if role in ("user", "assistant") and text:
-                        messages.append({"role": role, "text": text})
-
-                if len(messages) >= count:
-                    break
+                        responses.append({"role": role, "text": text})
     except (OSError, UnicodeDecodeError):
         pass
 
-    return messages
+    # Any user/agent event means the log is in event_msg mode
+    return events if saw_event else responses
 
 
 def discover_sessions(path_filter=None):
@@ -172,28 +197,35 @@ def discover_sessions(path_filter=None):
     if not codex_dir.is_dir():
         return []
 
+    # Walk with scandir so file/dir checks come from the directory read;
+    # the only syscall per session is the stat() that fills size and mtime
     sessions = []
-    for jsonl_file in codex_dir.rglob("rollout-*.jsonl"):
-        if not jsonl_file.is_file():
-            continue
-        path_str = str(jsonl_file)
-        if path_filter and path_filter.lower() not in path_str.lower():
-            continue
-        file_stat = jsonl_file.stat()
-        rel = ""
+    pending = [(str(codex_dir), ())]
+    while pending:
+        dir_path, rel_parts = pending.pop()
         try:
-            rel_path = jsonl_file.relative_to(codex_dir)
-            parts = rel_path.parts
-            if len(parts) >= 3:
-                rel = "/".join(parts[:3])
-        except ValueError:
-            rel = ""
-        sessions.append({
-            "path": path_str,
-            "folder": rel,
-            "size": file_stat.st_size,
-            "mtime": file_stat.st_mtime,
-        })
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, rel_parts + (entry.name,)))
+                    continue
+                name = entry.name
+                if not (name.startswith("rollout-") and name.endswith(".jsonl")) or not entry.is_file():
+                    continue
+                path_str = entry.path
+                if path_filter and path_filter.lower() not in path_str.lower():
+                    continue
+                file_stat = entry.stat()
+                parts = rel_parts + (name,)
+                sessions.append({
+                    "path": path_str,
+                    "folder": "/".join(parts[:3]) if len(parts) >= 3 else "",
+                    "size": file_stat.st_size,
+                    "mtime": file_stat.st_mtime,
+                })
 
     sessions.sort(key=lambda s: s["mtime"], reverse=True)
     sessions = [s for s in sessions if s["size"] > 1024]
@@ -208,8 +240,7 @@ def select_session(sessions):
     filtered_sessions = []
     previews = []
     for session in sessions:
-        use_event_msgs = _codex_has_event_messages(session["path"])
-        preview = _extract_preview(session["path"], use_event_msgs)
+        preview = _extract_preview(session["path"])
         total = preview["user_count"] + preview["assistant_count"]
         if total == 0:
             continue
@@ -283,7 +314,7 @@ def build_model(input_path):
     with open(input_path, "r", encoding="utf-8") as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
             except json.JSONDecodeError:
                 continue
 
@@ -368,10 +399,15 @@ def build_model(input_path):
     return model
 
 
+def load_model(input_path):
+    """Read a session log and return its common model dict."""
+    return build_model(input_path)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Convert Codex JSONL to common log model")
     parser.add_argument("input", nargs="?", default=None, help="input JSONL file path (omit to select)")
-    parser.add_argument("-o", "--output", help="output JSON file path")
+    parser.add_argument("-o", "--output", help="output JSON file path ('-' for stdout)")
     parser.add_argument("--filter", default=None, help="filter sessions by path substring")
     args = parser.parse_args()
 
@@ -382,6 +418,13 @@ def main():
 
     model = build_model(input_path)
 
+    if args.output == "-":
+        # Stream to a downstream renderer; keep stdout free of anything but JSON
+        sys.stdout.buffer.write(json.dumps(model, ensure_ascii=False).encode("utf-8"))
+        sys.stdout.flush()
+        print(f"Converted {len(model['messages'])} messages -> stdout", file=sys.stderr)
+        return
+
     if args.output:
         output_path = args.output
     else:
@@ -14,6 +14,7 @@ import argparse
 import json
 import os
 import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -241,6 +242,11 @@ def build_model(input_path):
     return model
 
 
+def load_model(input_path):
+    """Read a session log and return its common model dict."""
+    return build_model(input_path)
+
+
 def _format_size(size_bytes):
     if size_bytes >= 1024 * 1024:
         return "{:.1f}M".format(size_bytes / (1024 * 1024))
@@ -426,7 +432,7 @@ def select_session(sessions):
 def main():
     parser = argparse.ArgumentParser(description="Convert Cursor session data to common log model")
     parser.add_argument("input", nargs="?", default=None, help="input file path (omit to select)")
-    parser.add_argument("-o", "--output", help="output JSON file path")
+    parser.add_argument("-o", "--output", help="output JSON file path ('-' for stdout)")
     parser.add_argument("--project", default=None, help="filter sessions by project name (substring match)")
     args = parser.parse_args()
 
@@ -437,6 +443,13 @@ def main():
 
     model = build_model(input_path)
 
+    if args.output == "-":
+        # Stream to a downstream renderer; keep stdout free of anything but JSON
+        sys.stdout.buffer.write(json.dumps(model, ensure_ascii=False).encode("utf-8"))
+        sys.stdout.flush()
+        print("Converted {} messages -> stdout".format(len(model["messages"])), file=sys.stderr)
+        return
+
     if args.output:
         output_path = args.output
     else:
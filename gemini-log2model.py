@@ -4,6 +4,7 @@
 import argparse
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -61,6 +62,13 @@ def build_model(session_data, input_path):
     return model
 
 
+def load_model(input_path):
+    """Read a session JSON file and return its common model dict."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        session_data = json.load(f)
+    return build_model(session_data, input_path)
+
+
 def _format_size(size_bytes):
     if size_bytes >= 1024 * 1024:
         return f"{size_bytes / (1024 * 1024):.1f}M"
@@ -105,22 +113,27 @@ def discover_sessions(project_filter=None):
         return []
 
     sessions = []
-    # Project directories in ~/.gemini/tmp/
-    for project_dir in sorted(gemini_tmp_dir.iterdir()):
-        if not project_dir.is_dir():
-            continue
-
+    # Project directories in ~/.gemini/tmp/ (scandir: no stat per is_dir check)
+    with os.scandir(gemini_tmp_dir) as it:
+        project_dirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+    for project_dir in project_dirs:
         project_name = project_dir.name
         if project_filter and project_filter.lower() not in project_name.lower():
             continue
 
         # Search in chats/
-        chats_dir = project_dir / "chats"
-        if chats_dir.is_dir():
-            for json_file in chats_dir.glob("session-*.json"):
-                file_stat = json_file.stat()
+        try:
+            it = os.scandir(os.path.join(project_dir.path, "chats"))
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if not (name.startswith("session-") and name.endswith(".json")):
+                    continue
+                file_stat = entry.stat()
                 sessions.append({
-                    "path": str(json_file),
+                    "path": entry.path,
                     "project": project_name,
                     "project_dir": project_dir.name,
                     "size": file_stat.st_size,
@@ -194,7 +207,7 @@ def select_session(sessions):
 def main():
     parser = argparse.ArgumentParser(description="Convert Gemini CLI session JSON to common log model")
     parser.add_argument("input", nargs="?", default=None, help="input session JSON path (omit to select)")
-    parser.add_argument("-o", "--output", help="output JSON file path")
+    parser.add_argument("-o", "--output", help="output JSON file path ('-' for stdout)")
     parser.add_argument("--project", default=None, help="filter sessions by project name (substring match)")
     args = parser.parse_args()
 
@@ -203,10 +216,14 @@ def main():
         sessions = discover_sessions(project_filter=args.project)
         input_path = select_session(sessions)
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        session_data = json.load(f)
-    
-    model = build_model(session_data, input_path)
+    model = load_model(input_path)
+
+    if args.output == "-":
+        # Stream to a downstream renderer; keep stdout free of anything but JSON
+        sys.stdout.buffer.write(json.dumps(model, ensure_ascii=False).encode("utf-8"))
+        sys.stdout.flush()
+        print(f"Converted {len(model['messages'])} messages -> stdout", file=sys.stderr)
+        return
 
     if args.output:
         output_path = args.output
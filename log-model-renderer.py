@@ -2,12 +2,19 @@
 """Render common log model (JSON) to Markdown / HTML / player / terminal."""
 
 import argparse
+import gzip
 import html
 import json
 import os
 import re
 import sys
 
+try:
+    # Optional: models can be tens of MB, where orjson parses several times faster
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 
 def _extract_text_from_model(entry):
     return entry.get("text", "") or ""
@@ -97,14 +104,10 @@ def format_tool_use(tool_use):
 
 def _truncate_text(text, truncate_length):
     """Truncate text to specified length, returning (text, was_truncated)."""
-    print(f"DEBUG: _truncate_text called with truncate_length={truncate_length}, text_len={len(text)}", file=sys.stderr, flush=True)
     if truncate_length is None or truncate_length == 0:
-        print(f"DEBUG: No truncation (truncate_length={truncate_length})", file=sys.stderr, flush=True)
         return text, False
     if len(text) > truncate_length:
-        print(f"DEBUG: Truncating {len(text)} -> {truncate_length}", file=sys.stderr, flush=True)
         return text[:truncate_length], True
-    print(f"DEBUG: No truncation needed ({len(text)} <= {truncate_length})", file=sys.stderr, flush=True)
     return text, False
 
 
@@ -1884,17 +1887,100 @@ def _create_time_label(timestamp, session_start_ts=None):
         return ""
 
 
-def convert_to_player(model, input_path, theme="console", ansi_mode="strip", range_spec=None, filters=None, truncate_length=500):
+# Strict UTC form the agents write ("2026-01-01T00:00:30.500Z"); shifted with integer math
+_ISO_UTC_RE = re.compile(r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6}))?Z")
+
+
+def _days_from_civil(y, m, d):
+    """Days since 1970-01-01 for a proleptic Gregorian date."""
+    y -= m <= 2
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _civil_from_days(z):
+    """Inverse of _days_from_civil: (year, month, day)."""
+    z += 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d = doy - (153 * mp + 2) // 5 + 1
+    m = mp + (3 if mp < 10 else -9)
+    return yoe + era * 400 + (m <= 2), m, d
+
+
+def shift_timestamp_us(timestamp, delta_us):
+    """Move an ISO timestamp by delta_us microseconds; unparseable values pass through.
+
+    Output matches datetime.isoformat() + "Z": microseconds are printed as six
+    digits only when non-zero.
+    """
+    match = _ISO_UTC_RE.fullmatch(timestamp)
+    if not match:
+        from datetime import datetime, timedelta
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except ValueError:
+            return timestamp
+        return (dt + timedelta(microseconds=delta_us)).isoformat().replace('+00:00', '') + 'Z'
+
+    y, mo, d, h, mi, sec, frac = match.groups()
+    total = ((_days_from_civil(int(y), int(mo), int(d)) * 86400
+              + int(h) * 3600 + int(mi) * 60 + int(sec)) * 1000000
+             + (int(frac.ljust(6, "0")) if frac else 0) + delta_us)
+    days, us = divmod(total, 86400000000)
+    secs, us = divmod(us, 1000000)
+    y, mo, d = _civil_from_days(days)
+    stamp = "%04d-%02d-%02dT%02d:%02d:%02d" % (y, mo, d, secs // 3600, secs // 60 % 60, secs % 60)
+    return (stamp + ".%06dZ" % us) if us else (stamp + "Z")
+
+
+def clock_offset_us(timestamp, hour, minute):
+    """Microseconds that move timestamp to hour:minute:00 on its own date; None if unparseable.
+
+    Canonical UTC "...Z" stamps are read straight off _ISO_UTC_RE; other ISO
+    forms go through datetime and keep their own offset.
+    """
+    match = _ISO_UTC_RE.fullmatch(timestamp)
+    if match:
+        h, mi, sec, frac = match.group(4, 5, 6, 7)
+        current = ((int(h) * 60 + int(mi)) * 60 + int(sec)) * 1000000 + (int(frac.ljust(6, "0")) if frac else 0)
+    else:
+        from datetime import datetime
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        current = ((dt.hour * 60 + dt.minute) * 60 + dt.second) * 1000000 + dt.microsecond
+    return (hour * 60 + minute) * 60 * 1000000 - current
+
+
+def _shift_timestamp(timestamp, delta):
+    """Move an ISO timestamp by delta (a timedelta); unparseable values pass through."""
+    return shift_timestamp_us(timestamp, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def convert_to_player(model, input_path, theme="console", ansi_mode="strip", range_spec=None, filters=None, truncate_length=500, time_shift=0):
     message_blocks = []
     message_number = 0
 
     messages = filter_messages_by_range(model.get("messages", []), range_spec)
 
+    # Timestamps are shifted as they are rendered; the model itself is left untouched
+    shift = round(time_shift * 1000000) if time_shift else 0
+
     # Get session start timestamp for relative time calculation
     session_start_ts = None
     for msg in messages:
         if msg.get("timestamp"):
             session_start_ts = msg["timestamp"]
+            if shift:
+                session_start_ts = shift_timestamp_us(session_start_ts, shift)
             break
 
     # Pre-process: collect tool_results from User messages to attach to following Assistant messages
@@ -1910,6 +1996,8 @@ def convert_to_player(model, input_path, theme="console", ansi_mode="strip", ran
         tool_results = _extract_tool_results_from_model(entry)
         thinking = _extract_thinking_from_model(entry)
         timestamp = entry.get("timestamp", "")
+        if timestamp and shift:
+            timestamp = shift_timestamp_us(timestamp, shift)
 
         # For User messages, collect tool_results to show on Agent side
         if role == "user" and tool_results:
@@ -2774,11 +2862,39 @@ def convert_to_terminal(model, input_path, ansi_mode="strip", range_spec=None, f
 # Main
 # ---------------------------------------------------------------------------
 
+DEFAULT_FILTERS = {
+    "thinking": True,
+    "tool_use": True,
+    "tool_result": True,
+    "progress": False,
+    "file_history": False
+}
+
+
+def render(model, fmt="md", input_name=None, theme="light", ansi_mode="strip", range_spec=None, filters=None,
+           truncate_length=500, time_shift=0):
+    """Render a model dict to a string in the given format.
+
+    filters overrides individual DEFAULT_FILTERS entries.  input_name is shown as
+    the source in markdown output and defaults to the model's own source.
+    time_shift (seconds) moves player timestamps without rewriting the model.
+    """
+    filters = dict(DEFAULT_FILTERS, **(filters or {}))
+    input_name = input_name or model.get("source") or "model"
+    if fmt == "terminal":
+        return convert_to_terminal(model, input_name, ansi_mode=ansi_mode, range_spec=range_spec, filters=filters, truncate_length=truncate_length)
+    if fmt == "player":
+        return convert_to_player(model, input_name, theme=theme, ansi_mode=ansi_mode, range_spec=range_spec, filters=filters, truncate_length=truncate_length, time_shift=time_shift)
+    if fmt == "html":
+        return convert_to_html(model, input_name, theme=theme, ansi_mode=ansi_mode, range_spec=range_spec, filters=filters, truncate_length=truncate_length)
+    return convert_to_markdown(model, input_name, ansi_mode=ansi_mode, range_spec=range_spec, filters=filters, truncate_length=truncate_length)
+
+
 
 def main():
     parser = argparse.ArgumentParser(description="Render common log model")
-    parser.add_argument("input", help="input model JSON file")
-    parser.add_argument("-o", "--output", help="output file path")
+    parser.add_argument("input", help="input model JSON file, optionally .gz ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="output file path ('-' for stdout)")
     parser.add_argument("-f", "--format", choices=["md", "html", "player", "terminal"], default="md",
                         help="output format: md, html, player, or terminal")
     parser.add_argument("-t", "--theme", choices=["light", "console"], default="light",
@@ -2791,24 +2907,32 @@ def main():
                         help="JSON string of output filters: {\"thinking\": true, \"tool_use\": true, ...}")
     parser.add_argument("--truncate", dest="truncate_length", type=int, default=500,
                         help="Maximum text length before truncation (default: 500, 0 = no truncate)")
+    parser.add_argument("--time-shift", type=float, default=0, metavar="SECONDS",
+                        help="shift player timestamps by this many seconds")
     args = parser.parse_args()
 
     # Parse filters
-    filters = {
-        "thinking": True,
-        "tool_use": True,
-        "tool_result": True,
-        "progress": False,
-        "file_history": False
-    }
+    filters = {}
     if args.filters_json:
         try:
-            filters.update(json.loads(args.filters_json))
+            filters = json.loads(args.filters_json)
         except json.JSONDecodeError:
             pass
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        model = json.load(f)
+    if args.input == "-":
+        if not args.output:
+            parser.error("-o is required when reading the model from stdin")
+        model = _json_loads(sys.stdin.buffer.read())
+        input_name = model.get("source") or "stdin"
+    elif args.input.endswith(".gz"):
+        # Usually a model_cache entry: name the original log, not the cache file
+        with gzip.open(args.input, "rb") as f:
+            model = _json_loads(f.read())
+        input_name = model.get("source") or args.input
+    else:
+        with open(args.input, "rb") as f:
+            model = _json_loads(f.read())
+        input_name = args.input
 
     if args.output:
         output_path = args.output
@@ -2816,14 +2940,16 @@ def main():
         extension = ".html" if args.format in ("html", "player", "terminal") else ".md"
         output_path = os.path.splitext(args.input)[0] + extension
 
-    if args.format == "terminal":
-        result = convert_to_terminal(model, args.input, ansi_mode=args.ansi_mode, range_spec=args.range_spec, filters=filters, truncate_length=args.truncate_length)
-    elif args.format == "player":
-        result = convert_to_player(model, args.input, theme=args.theme, ansi_mode=args.ansi_mode, range_spec=args.range_spec, filters=filters, truncate_length=args.truncate_length)
-    elif args.format == "html":
-        result = convert_to_html(model, args.input, theme=args.theme, ansi_mode=args.ansi_mode, range_spec=args.range_spec, filters=filters, truncate_length=args.truncate_length)
-    else:
-        result = convert_to_markdown(model, args.input, ansi_mode=args.ansi_mode, range_spec=args.range_spec, filters=filters, truncate_length=args.truncate_length)
+    result = render(model, args.format, input_name, theme=args.theme, ansi_mode=args.ansi_mode,
+                    range_spec=args.range_spec, filters=filters, truncate_length=args.truncate_length,
+                    time_shift=args.time_shift)
+
+    if output_path == "-":
+        # Keep stdout to the rendered document; the status line goes to stderr
+        sys.stdout.buffer.write(result.encode("utf-8"))
+        sys.stdout.flush()
+        print(f"Rendered {len(model.get('messages', []))} messages ({args.format}) -> stdout", file=sys.stderr)
+        return
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(result)
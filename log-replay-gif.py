@@ -14,6 +14,8 @@ import sys
 import tempfile
 from pathlib import Path
 
+from utils import PLAYBACK_DONE_JS
+
 
 def _run(cmd, check=True):
     return subprocess.run(cmd, check=check)
@@ -89,9 +91,8 @@ def _capture_frames(html_path, frame_dir, width, height, fps, speed, fmt, timeou
         page.click(play_btn)
 
         def is_done():
-            btn_text = page.eval_on_selector(play_btn, "el => el.textContent")
-            last = page.eval_on_selector(last_sel, "el => getComputedStyle(el).display")
-            return (btn_text or "").strip() == "play" and last != "none"
+            # One CDP round-trip per frame instead of one per selector
+            return page.evaluate(PLAYBACK_DONE_JS, [play_btn, last_sel])
 
         # Capture frames
         elapsed = 0.0
@@ -8,12 +8,38 @@ Requires:
 """
 
 import argparse
+import asyncio
+import glob
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from pathlib import Path
 
+from utils import PLAYBACK_DONE_JS
+
+
+# Playwright's screencast always captures at this rate
+CAPTURE_FPS = 25
+
+# Recording only needs the renderer: no GPU process, extensions or background
+# services.  --no-startup-window is left out because a persistent context
+# expects its initial window.
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+    "--disable-background-networking",
+    "--no-first-run",
+]
+
+# Reused Chromium profile: V8 code cache, fonts and shaders survive between runs
+PROFILE_DIR = Path.home() / ".cache" / "claude-session-replay" / "chromium-profile"
 
 def _run(cmd, check=True):
     return subprocess.run(cmd, check=check)
@@ -31,91 +57,275 @@ def _ensure_deps():
         raise SystemExit(1)
 
 
-def _record_with_playwright(html_path, out_mp4, width, height, fps, speed, fmt, theme, timeout_s):
+# Containers that take the recorded VP8 stream as-is; mp4 does not
+REMUX_SUFFIXES = (".webm", ".mkv")
+
+
+def _can_remux(out_path):
+    """True if the capture's VP8 stream can be stream-copied into out_path's container."""
+    return out_path.suffix.lower() in REMUX_SUFFIXES
+
+
+def _codec_args(out_path):
+    """Encoder flags for the output container: realtime VP8 for .webm, else H.264."""
+    if out_path.suffix.lower() == ".webm":
+        return ["-c:v", "libvpx", "-deadline", "realtime", "-cpu-used", "8", "-b:v", "2M"]
+    return ["-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-movflags", "+faststart"]
+
+
+async def _run_async(cmd):
+    proc = await asyncio.create_subprocess_exec(*cmd)
+    returncode = await proc.wait()
+    if returncode != 0:
+        print(f"{cmd[0]} exited with status {returncode}", file=sys.stderr)
+        raise SystemExit(returncode)
+
+
+async def _encode_video(webm_path, out_mp4, fps, remux_only):
+    """Turn the recorded webm into the requested output file.
+
+    A .webm output at the capture rate is simply moved into place.  With
+    remux_only the VP8 stream is copied into a .mkv target as-is.  An
+    explicit --fps that differs from the capture rate forces a full transcode;
+    otherwise -r is omitted so ffmpeg does not resample frames.
+    """
+    out_mp4.parent.mkdir(parents=True, exist_ok=True)
+    native_rate = fps in (None, CAPTURE_FPS)
+    if remux_only and not native_rate:
+        print(f"--fps {fps} differs from capture rate ({CAPTURE_FPS}); transcoding instead of remuxing",
+              file=sys.stderr)
+        remux_only = False
+    if remux_only and not _can_remux(out_mp4):
+        print(f"{out_mp4.suffix or 'this'} output cannot hold the captured VP8 stream; "
+              "transcoding instead of remuxing", file=sys.stderr)
+        remux_only = False
+
+    if native_rate and out_mp4.suffix.lower() == ".webm":
+        shutil.move(str(webm_path), str(out_mp4))
+        return
+
+    if remux_only:
+        await _run_async(["ffmpeg", "-y", "-i", str(webm_path), "-c", "copy", str(out_mp4)])
+        return
+
+    cmd = ["ffmpeg", "-y", "-i", str(webm_path)] + _codec_args(out_mp4)
+    if not native_rate:
+        cmd += ["-r", str(fps)]
+    await _run_async(cmd + [str(out_mp4)])
+
+
+async def _start_playback(page, fmt, speed):
+    """Set the playback speed, press play, and return (play_btn, last_sel) selectors."""
+    if fmt == "terminal":
+        play_btn = "#t-play"
+        speed_id = "#t-speed"
+        wait_sel = ".t-msg"
+        last_sel = ".t-msg:last-of-type"
+    else:
+        play_btn = "#btnPlay"
+        speed_id = "#speed"
+        wait_sel = ".message"
+        last_sel = ".message:last-of-type"
+
+    await page.wait_for_selector(wait_sel)
+
+    # Set speed
+    await page.eval_on_selector(speed_id, "(el, v) => { el.value = v; el.dispatchEvent(new Event('input', {bubbles:true})); }", str(speed))
+
+    # Start playback
+    await page.click(play_btn)
+    return play_btn, last_sel
+
+
+async def _launch_context(p, width, height, record_dir=None):
+    """Launch Chromium on the shared profile so caches survive across pages and runs.
+
+    Chromium locks its profile, so when another run holds the shared one this
+    run gets a throwaway profile that is removed when the context closes.
+    """
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    options = {
+        "headless": True,
+        "chromium_sandbox": False,
+        "args": CHROMIUM_ARGS,
+        "viewport": {"width": width, "height": height},
+    }
+    if record_dir is not None:
+        options["record_video_dir"] = str(record_dir)
+        options["record_video_size"] = {"width": width, "height": height}
+
+    context = None
+    # SingletonLock is a symlink that may dangle, so test the link itself
+    if not os.path.lexists(PROFILE_DIR / "SingletonLock"):
+        try:
+            context = await p.chromium.launch_persistent_context(str(PROFILE_DIR), **options)
+        except Exception:
+            # Lost a race for the profile with another run
+            context = None
+    if context is None:
+        profile = tempfile.mkdtemp(prefix="log-replay-profile-")
+        try:
+            context = await p.chromium.launch_persistent_context(profile, **options)
+        except Exception:
+            shutil.rmtree(profile, ignore_errors=True)
+            raise
+        context.on("close", lambda _: shutil.rmtree(profile, ignore_errors=True))
+
+    # The persistent context opens with a blank tab; each job gets its own page
+    for blank in context.pages:
+        await blank.close()
+    return context
+
+
+async def _record_with_playwright(jobs, width, height, fps, speed, fmt, timeout_s, remux_only=False, concurrency=1):
+    """Record the (html_path, out_path) jobs as concurrent pages of one browser context.
+
+    At most `concurrency` pages play at once; each recording is encoded as soon
+    as its page closes, overlapping ffmpeg with the pages still playing.
+    """
     # Import locally to avoid hard dependency at module import time
-    from playwright.sync_api import sync_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
 
     with tempfile.TemporaryDirectory(prefix="log-replay-video-") as tmpdir:
         record_dir = Path(tmpdir) / "record"
         record_dir.mkdir(parents=True, exist_ok=True)
+        slots = asyncio.Semaphore(max(1, concurrency))
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                chromium_sandbox=False,
-                args=["--no-sandbox", "--disable-setuid-sandbox"]
-            )
-            context = browser.new_context(
-                viewport={"width": width, "height": height},
-                record_video_dir=str(record_dir),
-                record_video_size={"width": width, "height": height},
+        async with async_playwright() as p:
+            context = await _launch_context(p, width, height, record_dir=record_dir)
+
+            async def record(html_path, out_mp4):
+                async with slots:
+                    page = await context.new_page()
+                    await page.goto(f"file://{html_path}")
+                    play_btn, last_sel = await _start_playback(page, fmt, speed)
+
+                    # Wait until playback completes or timeout; the predicate runs in the
+                    # browser so completion is noticed on the next frame, not the next poll
+                    try:
+                        await page.wait_for_function(
+                            PLAYBACK_DONE_JS, arg=[play_btn, last_sel], timeout=int(timeout_s * 1000)
+                        )
+                    except PlaywrightTimeoutError:
+                        pass
+
+                    # Closing the page flushes its video
+                    video = page.video
+                    await page.close()
+                    webm_path = Path(await video.path())
+
+                if not webm_path.exists():
+                    print("No recorded video found.", file=sys.stderr)
+                    raise SystemExit(1)
+                await _encode_video(webm_path, out_mp4, fps, remux_only)
+
+            await asyncio.gather(*(record(html_path, out_mp4) for html_path, out_mp4 in jobs))
+            await context.close()
+
+
+async def _capture_frames_to_ffmpeg(jobs, width, height, fps, speed, fmt, timeout_s):
+    """Screenshot each page at the target fps and pipe JPEG frames straight into ffmpeg.
+
+    Skips Playwright's VP8 screencast entirely, so ffmpeg does the only
+    encode.  Frames are laid on a wall-clock grid: a slow screenshot
+    repeats the previous frame rather than speeding the video up.  Jobs run
+    one at a time so screenshots are not starved by other pages.
+    """
+    from playwright.async_api import async_playwright
+
+    fps = fps or CAPTURE_FPS
+    async with async_playwright() as p:
+        context = await _launch_context(p, width, height)
+        for html_path, out_mp4 in jobs:
+            out_mp4.parent.mkdir(parents=True, exist_ok=True)
+            ffmpeg = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-y", "-f", "image2pipe", "-framerate", str(fps), "-c:v", "mjpeg", "-i", "-",
+                *_codec_args(out_mp4), str(out_mp4),
+                stdin=subprocess.PIPE,
             )
-            page = context.new_page()
-            page.goto(f"file://{html_path}")
-
-            if fmt == "terminal":
-                play_btn = "#t-play"
-                speed_id = "#t-speed"
-                wait_sel = ".t-msg"
-                last_sel = ".t-msg:last-of-type"
-            else:
-                play_btn = "#btnPlay"
-                speed_id = "#speed"
-                wait_sel = ".message"
-                last_sel = ".message:last-of-type"
-
-            page.wait_for_selector(wait_sel)
-
-            # Set speed
-            page.eval_on_selector(speed_id, "(el, v) => { el.value = v; el.dispatchEvent(new Event('input', {bubbles:true})); }", str(speed))
-
-            # Start playback
-            page.click(play_btn)
-
-            def is_done():
-                btn_text = page.eval_on_selector(play_btn, "el => el.textContent")
-                last = page.eval_on_selector(last_sel, "el => getComputedStyle(el).display")
-                return (btn_text or "").strip() == "play" and last != "none"
-
-            # Wait until playback completes or timeout
-            elapsed = 0.0
-            step = 0.5
-            while elapsed < timeout_s:
-                if is_done():
-                    break
-                page.wait_for_timeout(int(step * 1000))
-                elapsed += step
-
-            # Close to flush video
-            context.close()
-            browser.close()
-
-        # Find latest webm
-        webms = sorted(record_dir.glob("*.webm"), key=lambda p: p.stat().st_mtime, reverse=True)
-        if not webms:
-            print("No recorded video found.", file=sys.stderr)
-            raise SystemExit(1)
-
-        webm_path = webms[0]
-        out_mp4.parent.mkdir(parents=True, exist_ok=True)
-        _run([
-            "ffmpeg", "-y", "-i", str(webm_path),
-            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", str(fps), str(out_mp4)
-        ])
+
+            try:
+                page = await context.new_page()
+                await page.goto(f"file://{html_path}")
+                play_btn, last_sel = await _start_playback(page, fmt, speed)
+
+                start = time.monotonic()
+                written = 0
+                while True:
+                    frame = await page.screenshot(type="jpeg", quality=85)
+                    elapsed = time.monotonic() - start
+                    repeat = max(1, int(elapsed * fps) + 1 - written)
+                    for _ in range(repeat):
+                        ffmpeg.stdin.write(frame)
+                    await ffmpeg.stdin.drain()
+                    written += repeat
+
+                    if elapsed >= timeout_s or await page.evaluate(PLAYBACK_DONE_JS, [play_btn, last_sel]):
+                        break
+
+                    ahead = written / fps - (time.monotonic() - start)
+                    if ahead > 0:
+                        await asyncio.sleep(ahead)
+
+                await page.close()
+            finally:
+                ffmpeg.stdin.close()
+                returncode = await ffmpeg.wait()
+
+            if returncode != 0:
+                print("ffmpeg failed to encode captured frames.", file=sys.stderr)
+                raise SystemExit(returncode)
+        await context.close()
+
+
+def _render_html(args, input_path, html_path):
+    """Create the player/terminal HTML via the existing log-replay.py pipeline."""
+    cmd = [sys.executable, "log-replay.py", "--agent", args.agent]
+    if input_path:
+        cmd.append(input_path)
+    if args.project:
+        cmd += ["--log-arg", "--project", "--log-arg", args.project]
+    if args.filter:
+        cmd += ["--log-arg", "--filter", "--log-arg", args.filter]
+    cmd += ["-f", args.format, "-t", args.theme, "-o", str(html_path)]
+    if args.range_spec:
+        cmd += ["--render-arg=--range", "--render-arg", args.range_spec]
+    for extra in args.log_arg:
+        if extra.startswith("-"):
+            cmd.append(f"--log-arg={extra}")
+        else:
+            cmd += ["--log-arg", extra]
+    for extra in args.render_arg:
+        if extra.startswith("-"):
+            cmd.append(f"--render-arg={extra}")
+        else:
+            cmd += ["--render-arg", extra]
+    _run(cmd)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Record log replay to MP4")
     parser.add_argument("--agent", choices=["claude", "codex"], required=True, help="log agent type")
     parser.add_argument("input", nargs="?", default=None, help="input JSONL file path (omit to select)")
-    parser.add_argument("-o", "--output", help="output mp4 path")
+    parser.add_argument("-o", "--output", help="output mp4 path (output directory with --batch)")
+    parser.add_argument("--batch", metavar="GLOB",
+                        help="record every JSONL matching GLOB in one browser session")
+    parser.add_argument("-j", "--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="sessions recorded concurrently with --batch (default: half the CPU cores)")
     parser.add_argument("-f", "--format", choices=["player", "terminal"], default="player", help="render format")
     parser.add_argument("-t", "--theme", choices=["light", "console"], default="console", help="theme")
     parser.add_argument("--width", type=int, default=1280)
     parser.add_argument("--height", type=int, default=720)
-    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--fps", type=int, default=None, help=f"output frame rate (default: {CAPTURE_FPS}, the capture rate)")
     parser.add_argument("--speed", type=float, default=1.0)
     parser.add_argument("--timeout", type=float, default=600, help="max seconds to wait")
+    parser.add_argument("--remux-only", action="store_true",
+                        help="copy the recorded VP8 stream without re-encoding (.webm or .mkv output; "
+                             "other containers are transcoded)")
+    parser.add_argument("--capture", choices=["video", "frames"], default="video",
+                        help="video: record Playwright's webm then encode; "
+                             "frames: pipe screenshots straight into a single x264 encode")
     parser.add_argument("--project", help="(claude) filter sessions by project name")
     parser.add_argument("--filter", help="(codex) filter sessions by path substring")
     parser.add_argument("-r", "--range", dest="range_spec",
@@ -124,36 +334,41 @@ def main():
     parser.add_argument("--render-arg", action="append", default=[], help="extra args for renderer (repeatable)")
     args = parser.parse_args()
 
+    if args.capture == "frames" and args.remux_only:
+        parser.error("--remux-only needs the recorded webm; it cannot be combined with --capture frames")
+
+    if args.batch:
+        if args.input:
+            parser.error("pass either an input file or --batch, not both")
+        inputs = sorted(glob.glob(os.path.expanduser(args.batch), recursive=True))
+        if not inputs:
+            parser.error(f"--batch pattern matched no files: {args.batch}")
+    else:
+        inputs = [args.input]
+
     _ensure_deps()
 
     # Create HTML via existing pipeline
     with tempfile.TemporaryDirectory(prefix="log-replay-html-") as tmpdir:
-        html_path = Path(tmpdir) / "replay.html"
-        cmd = [sys.executable, "log-replay.py", "--agent", args.agent]
-        if args.input:
-            cmd.append(args.input)
-        if args.project:
-            cmd += ["--log-arg", "--project", "--log-arg", args.project]
-        if args.filter:
-            cmd += ["--log-arg", "--filter", "--log-arg", args.filter]
-        cmd += ["-f", args.format, "-t", args.theme, "-o", str(html_path)]
-        if args.range_spec:
-            cmd += ["--render-arg=--range", "--render-arg", args.range_spec]
-        for extra in args.log_arg:
-            if extra.startswith("-"):
-                cmd.append(f"--log-arg={extra}")
-            else:
-                cmd += ["--log-arg", extra]
-        for extra in args.render_arg:
-            if extra.startswith("-"):
-                cmd.append(f"--render-arg={extra}")
+        jobs = []
+        for i, input_path in enumerate(inputs):
+            html_path = Path(tmpdir) / f"replay-{i}.html"
+            _render_html(args, input_path, html_path)
+            stem = os.path.splitext(input_path or "session")[0]
+            if args.batch:
+                out_mp4 = Path(args.output) / (Path(stem).name + ".mp4") if args.output else Path(stem + ".mp4")
             else:
-                cmd += ["--render-arg", extra]
-        _run(cmd)
+                out_mp4 = Path(args.output) if args.output else Path(stem + ".mp4")
+            jobs.append((str(html_path), out_mp4))
 
-        out_mp4 = Path(args.output) if args.output else Path(os.path.splitext(args.input or "session")[0] + ".mp4")
-        _record_with_playwright(str(html_path), out_mp4, args.width, args.height, args.fps, args.speed, args.format, args.theme, args.timeout)
-        print(f"Wrote {out_mp4}")
+        if args.capture == "frames":
+            asyncio.run(_capture_frames_to_ffmpeg(jobs, args.width, args.height, args.fps, args.speed,
+                                                  args.format, args.timeout))
+        else:
+            asyncio.run(_record_with_playwright(jobs, args.width, args.height, args.fps, args.speed, args.format,
+                                                args.timeout, remux_only=args.remux_only, concurrency=args.jobs))
+        for _, out_mp4 in jobs:
+            print(f"Wrote {out_mp4}")
 
 
 if __name__ == "__main__":
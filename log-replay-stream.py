@@ -12,46 +12,27 @@ Usage:
 """
 
 import argparse
-import importlib.util
 import json
 import os
 import signal
 import sys
 import time
-from pathlib import Path
+
+import model_cache
 
 
 # ---------------------------------------------------------------------------
 # Adapter loading
 # ---------------------------------------------------------------------------
 
-_script_dir = Path(__file__).parent
 _adapters = {}
 
-_ADAPTER_FILES = {
-    "claude": "claude-log2model.py",
-    "codex": "codex-log2model.py",
-    "gemini": "gemini-log2model.py",
-    "aider": "aider-log2model.py",
-    "cursor": "cursor-log2model.py",
-}
-
-
-def _import_module(name, filepath):
-    spec = importlib.util.spec_from_file_location(name, filepath)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
 
 def _get_adapter(agent):
     if agent not in _adapters:
-        if agent not in _ADAPTER_FILES:
+        if agent not in model_cache.LOG2MODEL_SCRIPTS:
             raise ValueError("Unknown agent: {}".format(agent))
-        _adapters[agent] = _import_module(
-            "{}_log2model".format(agent),
-            str(_script_dir / _ADAPTER_FILES[agent]),
-        )
+        _adapters[agent] = model_cache.load_adapter(agent)
     return _adapters[agent]
 
 
@@ -315,7 +296,7 @@ def _find_latest_active_session(agent=None, max_age_seconds=60):
 
     Returns (path, agent_name) or (None, None).
     """
-    agents = [agent] if agent else list(_ADAPTER_FILES.keys())
+    agents = [agent] if agent else list(model_cache.LOG2MODEL_SCRIPTS)
     best = None
     best_mtime = 0
     best_agent = None
@@ -458,7 +439,7 @@ def main():
     )
     parser.add_argument("input", nargs="?", default=None,
                         help="input session log file (omit to auto-select latest)")
-    parser.add_argument("--agent", choices=list(_ADAPTER_FILES.keys()), default=None,
+    parser.add_argument("--agent", choices=list(model_cache.LOG2MODEL_SCRIPTS), default=None,
                         help="agent type (required unless --session)")
     parser.add_argument("-f", "--follow", action="store_true",
                         help="keep watching for new lines (like tail -f)")
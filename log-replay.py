@@ -8,11 +8,45 @@ import sys
 import tempfile
 from pathlib import Path
 
+import model_cache
+
 
 def _run(cmd):
     return subprocess.run(cmd, check=False)
 
 
+def _run_piped(producer_cmd, consumer_cmd, tee_path=None):
+    """Run producer | consumer, exiting with the first non-zero return code.
+
+    With tee_path the stream is also copied to that file on its way through.
+    """
+    producer = subprocess.Popen(producer_cmd, stdout=subprocess.PIPE)
+    if tee_path is None:
+        consumer = subprocess.Popen(consumer_cmd, stdin=producer.stdout)
+        # Drop our copy of the read end so the producer sees SIGPIPE if the consumer dies
+        producer.stdout.close()
+    else:
+        consumer = subprocess.Popen(consumer_cmd, stdin=subprocess.PIPE)
+        with open(tee_path, "wb") as tee:
+            try:
+                for chunk in iter(lambda: producer.stdout.read(1 << 16), b""):
+                    tee.write(chunk)
+                    consumer.stdin.write(chunk)
+            except BrokenPipeError:
+                pass
+        producer.stdout.close()
+        try:
+            consumer.stdin.close()
+        except BrokenPipeError:
+            pass
+    consumer_rc = consumer.wait()
+    producer_rc = producer.wait()
+    if producer_rc != 0:
+        raise SystemExit(producer_rc)
+    if consumer_rc != 0:
+        raise SystemExit(consumer_rc)
+
+
 def _cli_main(args):
     """CLI mode (with command-line arguments)."""
     # Delegate pdf/gif to their standalone export scripts
@@ -70,8 +104,25 @@ def _cli_main(args):
         if args.filter:
             agent_args += ["--filter", args.filter]
 
-    if args.model:
+    # Models for a known input are cached by (path, mtime, size), or by a
+    # content fingerprint with --strict-cache; extra --log-arg flags may change
+    # the model, so they bypass the cache.  Without -o the renderer writes next
+    # to the model file, so keep that out of the cache dir.
+    use_cache = (not args.model and bool(args.input) and bool(args.output)
+                 and not args.log_arg and not args.no_cache)
+    cached = model_cache.lookup(args.input, args.agent, args.strict_cache) if use_cache else None
+
+    # With a known input and output, stream the model through a pipe so the
+    # renderer starts parsing while the adapter is still writing.  The
+    # interactive session picker needs stdout, so that case keeps a temp file.
+    stream = not cached and not args.model and bool(args.input) and bool(args.output)
+
+    if cached:
+        model_path = cached
+    elif args.model:
         model_path = args.model
+    elif stream:
+        model_path = "-"
     else:
         fd, model_path = tempfile.mkstemp(prefix="log-model-", suffix=".json")
         os.close(fd)
@@ -84,16 +135,35 @@ def _cli_main(args):
     if args.log_arg:
         log_cmd += args.log_arg
 
-    res = _run(log_cmd)
-    if res.returncode != 0:
-        raise SystemExit(res.returncode)
-
     render_cmd = [sys.executable, "log-model-renderer.py", model_path, "-f", args.format, "-t", args.theme]
     if args.output:
         render_cmd += ["-o", args.output]
     if args.render_arg:
         render_cmd += args.render_arg
 
+    if cached:
+        res = _run(render_cmd)
+        if res.returncode != 0:
+            raise SystemExit(res.returncode)
+        return
+
+    if stream:
+        if not use_cache:
+            _run_piped(log_cmd, render_cmd)
+            return
+        tmp_path, final_path = model_cache.new_entry(args.input, args.agent, args.strict_cache)
+        try:
+            _run_piped(log_cmd, render_cmd, tee_path=tmp_path)
+        except SystemExit:
+            model_cache.discard(tmp_path)
+            raise
+        model_cache.commit(tmp_path, final_path)
+        return
+
+    res = _run(log_cmd)
+    if res.returncode != 0:
+        raise SystemExit(res.returncode)
+
     res = _run(render_cmd)
     if res.returncode != 0:
         raise SystemExit(res.returncode)
@@ -271,6 +341,10 @@ def main():
     parser.add_argument("-t", "--theme", choices=["light", "console"], default="light",
                         help="HTML theme: light (default) or console (dark)")
     parser.add_argument("--model", help="write model JSON to this path")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always re-run log2model instead of reusing a cached model")
+    parser.add_argument("--strict-cache", action="store_true",
+                        help="key the model cache on a content fingerprint instead of mtime")
     parser.add_argument("--project", help="(claude/gemini) filter sessions by project name")
     parser.add_argument("--filter", help="(codex) filter sessions by path substring")
     parser.add_argument("--log-arg", action="append", default=[], help="extra args for log2model (repeatable)")
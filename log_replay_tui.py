@@ -1,13 +1,8 @@
 #!/usr/bin/env python3
 """TUI application for Claude session replay."""
 
-import importlib.util
 import os
-import subprocess
-import sys
 import tempfile
-from datetime import datetime
-from pathlib import Path
 
 from textual import on, work
 from textual.app import App, ComposeResult
@@ -28,59 +23,33 @@ from textual.widgets import (
 )
 from textual.widgets.option_list import Option
 
+import model_cache
+import preview_cache
+from utils import format_mtime, format_size
+
 # ---------------------------------------------------------------------------
 # Module import helpers
 # ---------------------------------------------------------------------------
 
-script_dir = Path(__file__).parent
-
+# Adapters are loaded on first use and shared with the in-process conversion
+_get_adapter = model_cache.load_adapter
 
-def _import_module(name, filepath):
-    spec = importlib.util.spec_from_file_location(name, str(filepath))
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
 
+# Preview extraction is I/O-bound, so a small thread pool overlaps file reads on cache misses
+PREVIEW_WORKERS = 8
 
-claude_log2model = _import_module("claude_log2model", script_dir / "claude-log2model.py")
-codex_log2model = _import_module("codex_log2model", script_dir / "codex-log2model.py")
-gemini_log2model = _import_module("gemini_log2model", script_dir / "gemini-log2model.py")
-aider_log2model = _import_module("aider_log2model", script_dir / "aider-log2model.py")
-cursor_log2model = _import_module("cursor_log2model", script_dir / "cursor-log2model.py")
-
-ADAPTERS = {
-    "claude": claude_log2model,
-    "codex": codex_log2model,
-    "gemini": gemini_log2model,
-    "aider": aider_log2model,
-    "cursor": cursor_log2model,
-}
+# Delay before the session list is re-filtered, so a burst of keystrokes filters once
+SEARCH_DEBOUNCE = 0.15
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _format_size(size_bytes):
-    """Format bytes to human-readable size."""
-    if size_bytes >= 1024 * 1024:
-        return "{:.1f}M".format(size_bytes / (1024 * 1024))
-    if size_bytes >= 1024:
-        return "{:.0f}K".format(size_bytes / 1024)
-    return "{}B".format(size_bytes)
-
-
-def _format_date(mtime):
-    try:
-        return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
-    except (OSError, ValueError):
-        return ""
-
-
 def _get_preview_messages(session, agent):
     """Get preview messages using adapter's _extract_preview_messages if available."""
     path = session["path"]
-    adapter = ADAPTERS.get(agent)
+    adapter = _get_adapter(agent)
     if adapter and hasattr(adapter, "_extract_preview_messages"):
         if agent == "codex":
             return adapter._extract_preview_messages(path, count=5)
@@ -115,18 +84,6 @@ def _get_preview_messages(session, agent):
     return []
 
 
-def _get_session_preview(session, agent):
-    """Get preview metadata for a session."""
-    adapter = ADAPTERS.get(agent)
-    if not adapter:
-        return {}
-    path = session["path"]
-    if agent == "codex":
-        use_event = adapter._codex_has_event_messages(path)
-        return adapter._extract_preview(path, use_event)
-    return adapter._extract_preview(path)
-
-
 # ---------------------------------------------------------------------------
 # Session data structure for display
 # ---------------------------------------------------------------------------
@@ -141,26 +98,40 @@ class SessionInfo:
         self.project = session_dict.get("project", session_dict.get("folder", ""))
         self.size = session_dict.get("size", 0)
         self.mtime = session_dict.get("mtime", 0)
-        self.date = _format_date(self.mtime)
+        self.date = format_mtime(self.mtime)
         self.preview = preview
         self.user_count = preview.get("user_count", 0)
         self.assistant_count = preview.get("assistant_count", 0)
         self.total_msgs = self.user_count + self.assistant_count
         self.first_message = preview.get("first_message", "")
+        # Built once here (in the loader's worker thread) so filtering only re-lists strings
+        self.display_line = self._format_line()
+        self._preview_messages = None
+        self._preview_mtime = None
 
-    @property
-    def display_line(self):
+    def preview_messages(self):
+        """First messages for the preview pane, re-read only when the log changes."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = self.mtime
+        if self._preview_messages is None or mtime != self._preview_mtime:
+            self._preview_messages = _get_preview_messages(self.session, self.agent)
+            self._preview_mtime = mtime
+        return self._preview_messages
+
+    def _format_line(self):
         project = self.project
         if len(project) > 16:
             project = project[:14] + ".."
         first = self.first_message.replace("\n", " ")
         if len(first) > 50:
             first = first[:48] + ".."
-        return "{agent:7s}  {date:16s}  {proj:16s}  {size:>6s}  {msgs:>4d}  {first}".format(
+        return "{agent:7s}  {date:16s}  {proj:16s}  {size:>8s}  {msgs:>4d}  {first}".format(
             agent=self.agent,
             date=self.date,
             proj=project,
-            size=_format_size(self.size),
+            size=format_size(self.size),
             msgs=self.total_msgs,
             first=first,
         )
@@ -370,6 +341,7 @@ class LogReplayApp(App):
         self.all_sessions = []  # type: list[SessionInfo]
         self.filtered_sessions = []  # type: list[SessionInfo]
         self.selected_index = -1
+        self._search_timer = None
 
     # ---- Compose ----
 
@@ -420,23 +392,18 @@ class LogReplayApp(App):
     def load_sessions(self):
         """Load sessions for the current agent in a worker thread."""
         agent = self.current_agent
-        adapter = ADAPTERS.get(agent)
+        adapter = _get_adapter(agent)
         if not adapter:
             return
 
         raw_sessions = adapter.discover_sessions()
-        sessions = []
-        for s in raw_sessions:
-            try:
-                preview = _get_session_preview(s, agent)
-                total = preview.get("user_count", 0) + preview.get("assistant_count", 0)
-                if total == 0:
-                    continue
-                sessions.append(SessionInfo(s, agent, preview))
-            except Exception:
-                continue
-
-        self.all_sessions = sessions
+        previews = preview_cache.load_previews(agent, raw_sessions, adapter._extract_preview, PREVIEW_WORKERS)
+
+        self.all_sessions = [
+            SessionInfo(session, agent, preview)
+            for session, preview in zip(raw_sessions, previews)
+            if preview.get("user_count", 0) + preview.get("assistant_count", 0) > 0
+        ]
         self.call_from_thread(self._apply_filter)
 
     def _apply_filter(self):
@@ -482,7 +449,9 @@ class LogReplayApp(App):
 
     @on(Input.Changed, "#search-input")
     def on_search_changed(self, event):
-        self._apply_filter()
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._search_timer = self.set_timer(SEARCH_DEBOUNCE, self._apply_filter)
 
     @on(Button.Pressed, "#btn-claude")
     def on_claude(self):
@@ -572,72 +541,31 @@ class LogReplayApp(App):
         theme = self.selected_theme
         output = self.output_path
 
-        # Build pipeline commands
-        if agent == "claude":
-            log2model = "claude-log2model.py"
-        elif agent == "codex":
-            log2model = "codex-log2model.py"
-        elif agent == "aider":
-            log2model = "aider-log2model.py"
-        elif agent == "cursor":
-            log2model = "cursor-log2model.py"
-        else:
-            log2model = "gemini-log2model.py"
-
-        fd, model_path = tempfile.mkstemp(prefix="log-model-", suffix=".json")
-        os.close(fd)
-
-        log2model_path = str(script_dir / log2model)
-        renderer_path = str(script_dir / "log-model-renderer.py")
-
-        # Step 1: adapter
-        log_cmd = [sys.executable, log2model_path, input_path, "-o", model_path]
+        # Step 1: adapter (skipped when the model for this log revision is cached)
         try:
-            res = subprocess.run(log_cmd, capture_output=True, text=True, check=False)
-            if res.returncode != 0:
-                err = res.stderr.strip() or "adapter failed"
-                self.call_from_thread(
-                    self.notify, "Error in log2model: " + err, severity="error"
-                )
-                return
+            model = model_cache.cached_model(input_path, agent)
         except Exception as e:
             self.call_from_thread(
-                self.notify, "Error: " + str(e), severity="error"
+                self.notify, "Error in log2model: " + str(e), severity="error"
             )
             return
 
-        # Step 2: renderer
-        render_cmd = [sys.executable, renderer_path, model_path, "-f", fmt, "-t", theme]
-        if output:
-            render_cmd += ["-o", output]
-        else:
-            # Auto-generate output path for browser-viewable formats
-            if fmt in ("player", "terminal", "html"):
-                fd2, auto_path = tempfile.mkstemp(prefix="replay-", suffix=".html")
-                os.close(fd2)
-                render_cmd += ["-o", auto_path]
-                output = auto_path
+        # Step 2: renderer, in-process; without an explicit output path write to a temp file
+        if not output:
+            suffix = ".md" if fmt == "md" else ".html"
+            fd, output = tempfile.mkstemp(prefix="replay-", suffix=suffix)
+            os.close(fd)
 
         try:
-            res = subprocess.run(render_cmd, capture_output=True, text=True, check=False)
-            if res.returncode != 0:
-                err = res.stderr.strip() or "renderer failed"
-                self.call_from_thread(
-                    self.notify, "Error in renderer: " + err, severity="error"
-                )
-                return
+            result = model_cache.load_renderer().render(model, fmt, input_path, theme=theme)
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(result)
         except Exception as e:
             self.call_from_thread(
-                self.notify, "Error: " + str(e), severity="error"
+                self.notify, "Error in renderer: " + str(e), severity="error"
             )
             return
 
-        # Cleanup model
-        try:
-            os.remove(model_path)
-        except OSError:
-            pass
-
         # Open in browser for HTML formats
         if output and fmt in ("player", "terminal", "html"):
             import webbrowser
@@ -645,13 +573,9 @@ class LogReplayApp(App):
             self.call_from_thread(
                 self.notify, "Opened in browser: " + output, severity="information"
             )
-        elif output:
-            self.call_from_thread(
-                self.notify, "Output saved to " + output, severity="information"
-            )
         else:
             self.call_from_thread(
-                self.notify, "Conversion complete (output to stdout)", severity="information"
+                self.notify, "Output saved to " + output, severity="information"
             )
 
     # ---- Preview ----
@@ -668,7 +592,7 @@ class LogReplayApp(App):
         lines.append("[dim]Agent:[/dim]   {}".format(session_info.agent))
         lines.append("[dim]Date:[/dim]    {}".format(session_info.date))
         lines.append("[dim]Project:[/dim] {}".format(session_info.project or "(none)"))
-        lines.append("[dim]Size:[/dim]    {}".format(_format_size(session_info.size)))
+        lines.append("[dim]Size:[/dim]    {}".format(format_size(session_info.size)))
         lines.append("[dim]Messages:[/dim] {} total ({} user, {} assistant)".format(
             session_info.total_msgs, session_info.user_count, session_info.assistant_count
         ))
@@ -677,7 +601,7 @@ class LogReplayApp(App):
         lines.append("[bold]First messages:[/bold]")
         lines.append("")
 
-        preview_msgs = _get_preview_messages(session_info.session, session_info.agent)
+        preview_msgs = session_info.preview_messages()
         if preview_msgs:
             for msg in preview_msgs:
                 role = msg["role"]
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""On-disk cache of common-model JSON, keyed by the source log's path, mtime and size.
+
+Re-rendering an unchanged session in another format or theme reuses the cached
+model instead of running the log2model stage again.  Entries are stored
+gzip-compressed; log-model-renderer.py reads .gz models directly.
+
+The adapters and the renderer are also loaded in-process from here, so the
+TUI and web UI convert without spawning an interpreter per run.
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "claude-session-replay"
+MAX_ENTRIES = 64
+
+# Bump when the model layout changes in a way the adapter stamps would not catch
+MODEL_VERSION = 1
+
+# Tool output is highly repetitive, so even the fastest level shrinks models several-fold
+COMPRESS_LEVEL = 1
+
+LOG2MODEL_SCRIPTS = {
+    "claude": "claude-log2model.py",
+    "codex": "codex-log2model.py",
+    "gemini": "gemini-log2model.py",
+    "aider": "aider-log2model.py",
+    "cursor": "cursor-log2model.py",
+}
+
+_script_dir = Path(__file__).parent
+
+
+def _import_script(name, filename):
+    spec = importlib.util.spec_from_file_location(name, str(_script_dir / filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@lru_cache(maxsize=None)
+def load_adapter(agent):
+    """Load an agent's log2model module on first use; None for unknown agents."""
+    script = LOG2MODEL_SCRIPTS.get(agent)
+    if not script:
+        return None
+    return _import_script(agent + "_log2model", script)
+
+
+@lru_cache(maxsize=None)
+def load_renderer():
+    return _import_script("log_model_renderer", "log-model-renderer.py")
+
+
+def build_model(input_path, agent):
+    """Run the agent's adapter in-process and return the model dict."""
+    adapter = load_adapter(agent)
+    if adapter is None:
+        raise ValueError(f"unknown agent: {agent}")
+    return adapter.load_model(input_path)
+
+
+# Bytes read from each end of the log for a content fingerprint
+FINGERPRINT_CHUNK = 4096
+
+
+def _fast_fingerprint(path):
+    """sha256 over the first and last FINGERPRINT_CHUNK bytes plus the size.
+
+    Bounds I/O to 8 KB however large the log is; appended turns always change
+    the tail, so edits are still told apart without relying on mtime.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(FINGERPRINT_CHUNK)
+        if size > 2 * FINGERPRINT_CHUNK:
+            f.seek(-FINGERPRINT_CHUNK, os.SEEK_END)
+        tail = f.read(FINGERPRINT_CHUNK)
+    return hashlib.sha256(head + tail + size.to_bytes(8, "little")).hexdigest()[:16]
+
+
+def _adapter_stamp(agent):
+    """mtime and size of the agent's log2model script, so editing it invalidates its models."""
+    script = LOG2MODEL_SCRIPTS.get(agent)
+    if not script:
+        return ""
+    try:
+        st = os.stat(_script_dir / script)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def cache_key(input_path, agent, strict=False):
+    """Return a short hex key for the current state of input_path.
+
+    By default the key comes from (path, mtime, size); strict mode fingerprints
+    the file contents instead, so a log rewritten with its old mtime is not
+    mistaken for the cached revision.  MODEL_VERSION and the adapter script's
+    own stamp are mixed in, so a changed adapter never serves stale models.
+    """
+    path = os.path.abspath(input_path)
+    if strict:
+        raw = f"{agent}:{path}:{_fast_fingerprint(path)}"
+    else:
+        raw = f"{agent}:{path}:{os.path.getmtime(path)}:{os.path.getsize(path)}"
+    raw += f":v{MODEL_VERSION}:{_adapter_stamp(agent)}"
+    return hashlib.blake2b(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path(input_path, agent, strict=False):
+    return CACHE_DIR / f"{cache_key(input_path, agent, strict)}.json.gz"
+
+
+def lookup(input_path, agent, strict=False):
+    """Return the cached model path for input_path, or None on a miss."""
+    try:
+        path = cache_path(input_path, agent, strict)
+    except OSError:
+        return None
+    return str(path) if path.is_file() else None
+
+
+def new_entry(input_path, agent, strict=False):
+    """Reserve a temp file for a new entry; returns (tmp_path, final_path)."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    final = cache_path(input_path, agent, strict)
+    fd, tmp = tempfile.mkstemp(prefix=final.name.split(".")[0] + "-", suffix=".tmp", dir=str(CACHE_DIR))
+    os.close(fd)
+    return tmp, str(final)
+
+
+def commit(tmp_path, final_path):
+    """Compress a fully written model and atomically publish it."""
+    gz_path = tmp_path + ".gz"
+    try:
+        with open(tmp_path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=COMPRESS_LEVEL) as dst:
+            shutil.copyfileobj(src, dst, 1 << 16)
+        os.replace(gz_path, final_path)
+    finally:
+        discard(tmp_path)
+        discard(gz_path)
+    _prune()
+
+
+def discard(tmp_path):
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+def cached_model(input_path, agent, strict=False):
+    """Return the model dict for input_path, building it only on a cache miss."""
+    hit = lookup(input_path, agent, strict)
+    if hit:
+        with gzip.open(hit, "rb") as f:
+            return json.load(f)
+
+    model = build_model(input_path, agent)
+    tmp_path, final_path = new_entry(input_path, agent, strict)
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as f:
+            json.dump(model, f, ensure_ascii=False)
+        os.replace(tmp_path, final_path)
+    finally:
+        discard(tmp_path)
+    _prune()
+    return model
+
+
+def _prune():
+    """Keep only the MAX_ENTRIES most recently written models."""
+    try:
+        entries = sorted(CACHE_DIR.glob("*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for stale in entries[MAX_ENTRIES:]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
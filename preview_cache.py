@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""SQLite cache of session previews, keyed by (agent, path) and validated by mtime and size.
+
+Shared by the TUI and the web UI so an unchanged session log is summarized
+once instead of on every listing.
+"""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import model_cache
+
+DB_PATH = model_cache.CACHE_DIR / "previews.db"
+
+# Listings show at most ~80 chars of the first message; keeping a longer
+# prefix leaves room for search without storing whole pasted documents
+FIRST_MESSAGE_MAX = 500
+
+# Stored as the database's user_version; bump whenever an adapter's
+# _extract_preview (or the truncation above) changes what a row holds
+PREVIEW_VERSION = 2
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS previews (
+    agent TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    preview TEXT NOT NULL,
+    PRIMARY KEY (agent, path)
+)"""
+
+
+def _connect():
+    """Open the cache database, or return None if it is unusable."""
+    try:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), timeout=5)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != PREVIEW_VERSION:
+            # Rows from older extraction logic: start over
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS previews")
+                conn.execute(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {PREVIEW_VERSION:d}")
+        else:
+            conn.execute(_SCHEMA)
+        return conn
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _safe_extract(extract, path):
+    try:
+        preview = extract(path)
+    except Exception:
+        return {}, False
+    first = preview.get("first_message")
+    if first and len(first) > FIRST_MESSAGE_MAX:
+        preview["first_message"] = first[:FIRST_MESSAGE_MAX]
+    return preview, True
+
+
+def load_previews(agent, sessions, extract, workers=8):
+    """Return extract(session["path"]) for each session, in order.
+
+    Sessions whose mtime and size match a stored row are served from the
+    cache; the rest are extracted on a thread pool and written back in one
+    transaction.  A failing extract yields {} and is not cached.  first_message
+    is cut to FIRST_MESSAGE_MAX characters.
+    """
+    conn = _connect()
+    stored = {}
+    if conn is not None:
+        try:
+            rows = conn.execute("SELECT path, mtime, size, preview FROM previews WHERE agent = ?", (agent,))
+            stored = {path: (mtime, size, preview) for path, mtime, size, preview in rows}
+        except sqlite3.Error:
+            stored = {}
+
+    previews = [None] * len(sessions)
+    misses = []
+    for i, session in enumerate(sessions):
+        row = stored.get(session["path"])
+        if row and row[0] == session.get("mtime") and row[1] == session.get("size"):
+            previews[i] = json.loads(row[2])
+        else:
+            misses.append(i)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda i: _safe_extract(extract, sessions[i]["path"]), misses))
+        fresh = []
+        for i, (preview, ok) in zip(misses, results):
+            previews[i] = preview
+            session = sessions[i]
+            if ok and session.get("mtime") is not None and session.get("size") is not None:
+                fresh.append((agent, session["path"], session["mtime"], session["size"],
+                              json.dumps(preview, ensure_ascii=False)))
+        if conn is not None and fresh:
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO previews VALUES (?, ?, ?, ?, ?)", fresh)
+            except sqlite3.Error:
+                pass
+
+    if conn is not None:
+        conn.close()
+    return previews
@@ -5,44 +5,27 @@ Provides full-text search across session logs (cross-session and within-session)
 Uses ProcessPoolExecutor for parallel cross-session search.
 """
 
-import importlib.util
 import json
 import os
 import re
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from pathlib import Path
+
+import model_cache
 
 
 # ---------------------------------------------------------------------------
 # Adapter module loading
 # ---------------------------------------------------------------------------
 
-def _import_module(name, filepath):
-    spec = importlib.util.spec_from_file_location(name, filepath)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-_script_dir = Path(__file__).parent
 _adapters = {}
 
 
 def _get_adapter(agent):
-    """Lazily load and cache adapter modules."""
+    """Lazily load and cache adapter modules (one shared copy per process, via model_cache)."""
     if agent not in _adapters:
-        filemap = {
-            "claude": "claude-log2model.py",
-            "codex": "codex-log2model.py",
-            "gemini": "gemini-log2model.py",
-            "aider": "aider-log2model.py",
-            "cursor": "cursor-log2model.py",
-        }
-        if agent not in filemap:
+        if agent not in model_cache.LOG2MODEL_SCRIPTS:
             raise ValueError(f"Unknown agent: {agent}")
-        _adapters[agent] = _import_module(
-            f"{agent}_log2model", str(_script_dir / filemap[agent])
-        )
+        _adapters[agent] = model_cache.load_adapter(agent)
     return _adapters[agent]
 
 
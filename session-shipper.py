@@ -10,7 +10,6 @@ import copy
 import getpass
 import gzip
 import hashlib
-import importlib.util
 import json
 import logging
 import os
@@ -25,6 +24,8 @@ import urllib.request
 from datetime import datetime, timezone
 from pathlib import Path
 
+import model_cache
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -34,33 +35,21 @@ log = logging.getLogger("shipper")
 
 
 # ---------------------------------------------------------------------------
-# Adapter loading (same pattern as search_utils.py)
+# Adapter loading (shared through model_cache, like search_utils.py)
 # ---------------------------------------------------------------------------
 
-def _import_module(name, filepath):
-    spec = importlib.util.spec_from_file_location(name, filepath)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
 _script_dir = Path(__file__).parent
 _adapters = {}
 
-_ADAPTER_FILES = {
-    "claude": "claude-log2model.py",
-    "codex": "codex-log2model.py",
-    "gemini": "gemini-log2model.py",
-}
+# Agents the shipper knows how to tail; adapters come from model_cache
+SHIPPER_AGENTS = ("claude", "codex", "gemini")
 
 
 def _get_adapter(agent):
     if agent not in _adapters:
-        if agent not in _ADAPTER_FILES:
+        if agent not in SHIPPER_AGENTS:
             raise ValueError(f"Unknown agent: {agent}")
-        _adapters[agent] = _import_module(
-            f"{agent}_log2model", str(_script_dir / _ADAPTER_FILES[agent])
-        )
+        _adapters[agent] = model_cache.load_adapter(agent)
     return _adapters[agent]
 
 
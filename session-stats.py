@@ -6,7 +6,6 @@ Provides per-session stats, cross-session overview, and session diff/comparison.
 
 import argparse
 import html as html_mod
-import importlib.util
 import json
 import os
 import sys
@@ -14,38 +13,22 @@ import time
 from collections import Counter, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from pathlib import Path
+
+import model_cache
 
 
 # ---------------------------------------------------------------------------
-# Adapter loading (same pattern as search_utils.py)
+# Adapter loading (shared through model_cache, like search_utils.py)
 # ---------------------------------------------------------------------------
 
-def _import_module(name, filepath):
-    spec = importlib.util.spec_from_file_location(name, filepath)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-_script_dir = Path(__file__).parent
 _adapters = {}
-_ADAPTER_FILES = {
-    "claude": "claude-log2model.py",
-    "codex": "codex-log2model.py",
-    "gemini": "gemini-log2model.py",
-    "aider": "aider-log2model.py",
-    "cursor": "cursor-log2model.py",
-}
 
 
 def _get_adapter(agent):
     if agent not in _adapters:
-        if agent not in _ADAPTER_FILES:
+        if agent not in model_cache.LOG2MODEL_SCRIPTS:
             raise ValueError(f"Unknown agent: {agent}")
-        _adapters[agent] = _import_module(
-            f"{agent}_log2model", str(_script_dir / _ADAPTER_FILES[agent])
-        )
+        _adapters[agent] = model_cache.load_adapter(agent)
     return _adapters[agent]
 
 
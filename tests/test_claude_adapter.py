@@ -182,3 +182,31 @@ class TestBuildModel:
         messages = parse_messages(str(tmp_file))
         model = build_model(messages, str(tmp_file))
         assert model["source"] == "mytest.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# _extract_preview
+# ---------------------------------------------------------------------------
+
+class TestExtractPreview:
+    def test_counts_fixture_messages(self):
+        preview = claude_adapter._extract_preview(str(CLAUDE_FIXTURE))
+        assert preview["user_count"] > 0
+        assert preview["assistant_count"] > 0
+        assert preview["first_message"] == "Hello, can you help me?"
+        assert preview["git_branch"] == "main"
+
+    def test_skips_other_records_and_bad_lines(self, tmp_path):
+        tmp_file = tmp_path / "mixed.jsonl"
+        tmp_file.write_bytes(
+            b'{"type":"summary","summary":"s"}\n'
+            b'{"type": "user", "message": {"content": "spaced"}, "timestamp": "t1"}\n'
+            b'{"type":"user", broken\n'
+            b'\xff\xfe"assistant"\n'
+            b'{"type":"assistant","message":{"content":[]}}\n'
+        )
+        preview = claude_adapter._extract_preview(str(tmp_file))
+        assert preview["user_count"] == 1
+        assert preview["assistant_count"] == 1
+        assert preview["first_message"] == "spaced"
+        assert preview["timestamp"] == "t1"
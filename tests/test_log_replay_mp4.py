@@ -0,0 +1,44 @@
+"""Tests for log-replay-mp4.py output handling (no browser or ffmpeg needed)."""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+from conftest import load_module
+
+mp4 = load_module("log_replay_mp4", "log-replay-mp4.py")
+
+
+class TestCanRemux:
+    @pytest.mark.parametrize("name", ["out.webm", "out.mkv", "OUT.MKV"])
+    def test_vp8_containers(self, name):
+        assert mp4._can_remux(Path(name))
+
+    @pytest.mark.parametrize("name", ["out.mp4", "out.mov", "out"])
+    def test_other_containers(self, name):
+        assert not mp4._can_remux(Path(name))
+
+
+class TestEncodeVideo:
+    def _encode(self, monkeypatch, tmp_path, out_name):
+        commands = []
+
+        async def fake_run(cmd):
+            commands.append(cmd)
+
+        monkeypatch.setattr(mp4, "_run_async", fake_run)
+        asyncio.run(mp4._encode_video(tmp_path / "in.webm", tmp_path / out_name, None, True))
+        return commands
+
+    def test_mkv_is_stream_copied(self, monkeypatch, tmp_path):
+        [cmd] = self._encode(monkeypatch, tmp_path, "out.mkv")
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        assert "-movflags" not in cmd
+
+    def test_mp4_falls_back_to_transcode(self, monkeypatch, tmp_path, capsys):
+        [cmd] = self._encode(monkeypatch, tmp_path, "out.mp4")
+        assert "copy" not in cmd
+        assert "libx264" in cmd
+        assert "transcoding instead of remuxing" in capsys.readouterr().err
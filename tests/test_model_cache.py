@@ -0,0 +1,140 @@
+"""Tests for model_cache.py key and entry bookkeeping."""
+import gzip
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import model_cache
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CLAUDE_FIXTURE = FIXTURES_DIR / "claude_session.jsonl"
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(model_cache, "CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture
+def session_file(tmp_path):
+    path = tmp_path / "session.jsonl"
+    path.write_bytes(CLAUDE_FIXTURE.read_bytes())
+    return path
+
+
+class TestCacheKey:
+    def test_key_is_stable(self, session_file):
+        assert model_cache.cache_key(str(session_file), "claude") == \
+            model_cache.cache_key(str(session_file), "claude")
+
+    def test_key_depends_on_agent(self, session_file):
+        assert model_cache.cache_key(str(session_file), "claude") != \
+            model_cache.cache_key(str(session_file), "codex")
+
+    def test_key_changes_when_file_changes(self, session_file):
+        before = model_cache.cache_key(str(session_file), "claude")
+        with open(session_file, "a", encoding="utf-8") as f:
+            f.write("\n")
+        assert model_cache.cache_key(str(session_file), "claude") != before
+
+    def test_key_changes_with_model_version(self, session_file, monkeypatch):
+        before = model_cache.cache_key(str(session_file), "claude")
+        monkeypatch.setattr(model_cache, "MODEL_VERSION", model_cache.MODEL_VERSION + 1)
+        assert model_cache.cache_key(str(session_file), "claude") != before
+
+    def test_key_changes_when_adapter_changes(self, session_file, tmp_path, monkeypatch):
+        adapter = tmp_path / "claude-log2model.py"
+        adapter.write_text("# v1\n", encoding="utf-8")
+        monkeypatch.setattr(model_cache, "_script_dir", tmp_path)
+        before = model_cache.cache_key(str(session_file), "claude")
+        adapter.write_text("# v2 (longer)\n", encoding="utf-8")
+        assert model_cache.cache_key(str(session_file), "claude") != before
+
+
+class TestEntries:
+    def test_lookup_misses_on_empty_cache(self, cache_dir, session_file):
+        assert model_cache.lookup(str(session_file), "claude") is None
+
+    def test_lookup_missing_input_returns_none(self, cache_dir, tmp_path):
+        assert model_cache.lookup(str(tmp_path / "nope.jsonl"), "claude") is None
+
+    def test_commit_makes_entry_visible(self, cache_dir, session_file):
+        tmp, final = model_cache.new_entry(str(session_file), "claude")
+        Path(tmp).write_text("{}", encoding="utf-8")
+        model_cache.commit(tmp, final)
+        assert model_cache.lookup(str(session_file), "claude") == final
+        assert not os.path.exists(tmp)
+        with gzip.open(final, "rt", encoding="utf-8") as f:
+            assert f.read() == "{}"
+
+    def test_discard_removes_temp_file(self, cache_dir, session_file):
+        tmp, _ = model_cache.new_entry(str(session_file), "claude")
+        model_cache.discard(tmp)
+        assert not os.path.exists(tmp)
+        assert model_cache.lookup(str(session_file), "claude") is None
+
+    def test_prune_keeps_max_entries(self, cache_dir, monkeypatch):
+        monkeypatch.setattr(model_cache, "MAX_ENTRIES", 2)
+        cache_dir.mkdir()
+        for i in range(4):
+            entry = cache_dir / f"{i}.json.gz"
+            entry.write_text("{}", encoding="utf-8")
+            os.utime(entry, (i, i))
+        model_cache._prune()
+        assert sorted(p.name for p in cache_dir.glob("*.json.gz")) == ["2.json.gz", "3.json.gz"]
+
+
+class TestCachedModel:
+    def test_builds_then_reuses_model(self, cache_dir, session_file):
+        first = model_cache.cached_model(str(session_file), "claude")
+        assert first["agent"] == "claude"
+        entry = model_cache.cache_path(str(session_file), "claude")
+        assert entry.is_file()
+        mtime = os.path.getmtime(entry)
+        assert model_cache.cached_model(str(session_file), "claude") == first
+        assert os.path.getmtime(entry) == mtime
+
+    def test_adapter_failure_leaves_no_entry(self, cache_dir, tmp_path):
+        broken = tmp_path / "broken.jsonl"
+        broken.write_text("not json\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            model_cache.cached_model(str(broken), "claude")
+        assert not cache_dir.exists() or list(cache_dir.glob("*")) == []
+
+
+class TestBuildModel:
+    def test_unknown_agent(self, session_file):
+        with pytest.raises(ValueError):
+            model_cache.build_model(str(session_file), "nope")
+
+    def test_renders_in_process(self, session_file):
+        model = model_cache.build_model(str(session_file), "claude")
+        out = model_cache.load_renderer().render(model, "md", str(session_file))
+        assert "Source: `session.jsonl`" in out
+
+
+class TestStrictKey:
+    def test_ignores_mtime(self, session_file):
+        key = model_cache.cache_key(str(session_file), "claude", strict=True)
+        os.utime(session_file, (1, 1))
+        assert model_cache.cache_key(str(session_file), "claude", strict=True) == key
+
+    def test_changes_when_tail_changes(self, session_file):
+        key = model_cache.cache_key(str(session_file), "claude", strict=True)
+        with open(session_file, "ab") as f:
+            f.write(b"\n")
+        assert model_cache.cache_key(str(session_file), "claude", strict=True) != key
+
+    def test_large_file_reads_head_and_tail(self, tmp_path):
+        big = tmp_path / "big.jsonl"
+        big.write_bytes(b"a" * 20000)
+        before = model_cache._fast_fingerprint(str(big))
+        with open(big, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"b")
+        assert model_cache._fast_fingerprint(str(big)) != before
@@ -0,0 +1,76 @@
+"""Tests for preview_cache.py."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import preview_cache
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "previews.db"
+    monkeypatch.setattr(preview_cache, "DB_PATH", path)
+    return path
+
+
+def _session(path, mtime=1.0, size=10):
+    return {"path": str(path), "mtime": mtime, "size": size}
+
+
+class TestLoadPreviews:
+    def test_second_load_hits_cache(self, db_path):
+        calls = []
+
+        def extract(path):
+            calls.append(path)
+            return {"user_count": 1, "first_message": path}
+
+        sessions = [_session("a"), _session("b")]
+        first = preview_cache.load_previews("claude", sessions, extract)
+        second = preview_cache.load_previews("claude", sessions, extract)
+        assert first == second == [{"user_count": 1, "first_message": "a"},
+                                   {"user_count": 1, "first_message": "b"}]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_changed_mtime_or_size_is_reextracted(self, db_path):
+        calls = []
+
+        def extract(path):
+            calls.append(path)
+            return {"n": len(calls)}
+
+        preview_cache.load_previews("claude", [_session("a")], extract)
+        assert preview_cache.load_previews("claude", [_session("a", mtime=2.0)], extract) == [{"n": 2}]
+        assert preview_cache.load_previews("claude", [_session("a", mtime=2.0, size=11)], extract) == [{"n": 3}]
+
+    def test_first_message_is_truncated(self, db_path):
+        long_text = "x" * (preview_cache.FIRST_MESSAGE_MAX + 100)
+        extract = lambda p: {"first_message": long_text}
+        first = preview_cache.load_previews("claude", [_session("a")], extract)
+        second = preview_cache.load_previews("claude", [_session("a")], extract)
+        assert first == second == [{"first_message": long_text[:preview_cache.FIRST_MESSAGE_MAX]}]
+
+    def test_version_bump_drops_stored_rows(self, db_path, monkeypatch):
+        preview_cache.load_previews("claude", [_session("a")], lambda p: {"v": 1})
+        monkeypatch.setattr(preview_cache, "PREVIEW_VERSION", preview_cache.PREVIEW_VERSION + 1)
+        assert preview_cache.load_previews("claude", [_session("a")], lambda p: {"v": 2}) == [{"v": 2}]
+        assert preview_cache.load_previews("claude", [_session("a")], lambda p: {"v": 3}) == [{"v": 2}]
+
+    def test_agents_do_not_share_rows(self, db_path):
+        preview_cache.load_previews("claude", [_session("a")], lambda p: {"agent": "claude"})
+        assert preview_cache.load_previews("codex", [_session("a")], lambda p: {"agent": "codex"}) == [{"agent": "codex"}]
+
+    def test_failed_extract_is_not_cached(self, db_path):
+        def broken(path):
+            raise OSError("unreadable")
+
+        assert preview_cache.load_previews("claude", [_session("a")], broken) == [{}]
+        assert preview_cache.load_previews("claude", [_session("a")], lambda p: {"ok": True}) == [{"ok": True}]
+
+    def test_unusable_db_still_extracts(self, tmp_path, monkeypatch):
+        blocker = tmp_path / "file"
+        blocker.write_text("", encoding="utf-8")
+        monkeypatch.setattr(preview_cache, "DB_PATH", blocker / "previews.db")
+        assert preview_cache.load_previews("claude", [_session("a")], lambda p: {"ok": True}) == [{"ok": True}]
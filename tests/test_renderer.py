@@ -192,3 +192,51 @@ class TestFormatToolUse:
         tool_use = {"name": "Bash", "input": {"command": ""}}
         result = format_tool_use(tool_use)
         assert "Bash" in result
+
+
+# ---------------------------------------------------------------------------
+# time_shift
+# ---------------------------------------------------------------------------
+
+class TestTimeShift:
+    MODEL = {"messages": [
+        {"role": "user", "text": "hi", "timestamp": "2026-01-01T00:00:00Z"},
+        {"role": "assistant", "text": "yo", "timestamp": "2026-01-01T00:00:30.500000Z"},
+    ]}
+
+    def test_shift_timestamp(self):
+        from datetime import timedelta
+        assert renderer._shift_timestamp("2026-01-01T00:00:00Z", timedelta(hours=1)) == "2026-01-01T01:00:00Z"
+
+    def test_shift_matches_datetime(self):
+        from datetime import datetime, timedelta
+        # fromisoformat only takes 3 or 6 fraction digits before Python 3.11
+        for ts in ("2024-02-28T23:59:59.999Z", "1999-12-31T23:00:00Z", "2026-03-01T00:00:00.500000Z"):
+            for delta in (timedelta(milliseconds=1), timedelta(hours=-30, microseconds=7), timedelta(days=400)):
+                dt = datetime.fromisoformat(ts.replace("Z", "+00:00")) + delta
+                assert renderer._shift_timestamp(ts, delta) == dt.isoformat().replace("+00:00", "") + "Z"
+
+    def test_shift_one_fraction_digit(self):
+        from datetime import timedelta
+        assert renderer._shift_timestamp("2026-03-01T00:00:00.5Z", timedelta(hours=-30, microseconds=7)) == \
+            "2026-02-27T18:00:00.500007Z"
+
+    def test_clock_offset_matches_datetime(self):
+        from datetime import datetime
+        for ts in ("2026-01-01T10:15:30.250Z", "2026-01-01T10:15:30+09:00", "2026-01-01T00:00:00Z"):
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            expected = dt.replace(hour=21, minute=33, second=0, microsecond=0) - dt
+            assert renderer.clock_offset_us(ts, 21, 33) == round(expected.total_seconds() * 1e6)
+
+    def test_clock_offset_unparseable_is_none(self):
+        assert renderer.clock_offset_us("yesterday", 1, 0) is None
+
+    def test_unparseable_timestamp_passes_through(self):
+        from datetime import timedelta
+        assert renderer._shift_timestamp("yesterday", timedelta(hours=1)) == "yesterday"
+
+    def test_player_timestamps_shifted_without_touching_model(self):
+        out = renderer.render(self.MODEL, "player", time_shift=3600)
+        assert 'data-timestamp="2026-01-01T01:00:00Z"' in out
+        assert 'data-timestamp="2026-01-01T01:00:30.500000Z"' in out
+        assert self.MODEL["messages"][0]["timestamp"] == "2026-01-01T00:00:00Z"
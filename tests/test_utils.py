@@ -0,0 +1,32 @@
+"""Tests for utils.py formatting helpers."""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import format_mtime, format_size
+
+
+class TestFormatSize:
+    def test_bytes(self):
+        assert format_size(0) == "0B"
+        assert format_size(1023) == "1023B"
+
+    def test_units(self):
+        assert format_size(1024) == "1KB"
+        assert format_size(1536) == "1.5KB"
+        assert format_size(5 * 1024 * 1024) == "5MB"
+        assert format_size(3 * 1024 ** 3 + 1024 ** 3 // 4) == "3.2GB"
+
+    def test_caps_at_terabytes(self):
+        assert format_size(2048 * 1024 ** 4) == "2048TB"
+
+
+class TestFormatMtime:
+    def test_matches_strftime(self):
+        for ts in (0, 1700000000, 1700000059.9, 1760000123.5):
+            expected = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
+            assert format_mtime(ts) == expected
+
+    def test_out_of_range(self):
+        assert format_mtime(1e20) == ""
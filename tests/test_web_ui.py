@@ -0,0 +1,128 @@
+"""Tests for web_ui.py endpoints, through Flask's test client."""
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import model_cache
+import preview_cache
+import web_ui
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CLAUDE_FIXTURE = FIXTURES_DIR / "claude_session.jsonl"
+
+MALFORMED_LINE = b'{"type": "user", "message": {oops'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(preview_cache, "DB_PATH", tmp_path / "cache" / "previews.db")
+    web_ui._model_memo.clear()
+    web_ui._render_memo.clear()
+    return web_ui.app.test_client()
+
+
+@pytest.fixture
+def session_with_bad_line(tmp_path):
+    lines = CLAUDE_FIXTURE.read_bytes().splitlines()
+    lines.insert(1, MALFORMED_LINE)
+    path = tmp_path / "session.jsonl"
+    path.write_bytes(b"\n".join(lines) + b"\n")
+    return path
+
+
+class TestApplyToSessionLog:
+    def _apply(self, client, path, **extra):
+        body = {"agent": "claude", "session_path": str(path), "edits": [], **extra}
+        resp = client.post("/api/apply-to-session-log", json=body)
+        assert resp.status_code == 200, resp.get_json()
+        return path.read_bytes().splitlines()
+
+    def test_malformed_line_kept_without_alibai(self, client, session_with_bad_line):
+        lines = self._apply(client, session_with_bad_line)
+        assert lines[1] == MALFORMED_LINE
+
+    def test_malformed_line_kept_with_alibai(self, client, session_with_bad_line):
+        lines = self._apply(client, session_with_bad_line, alibai_time="21:33")
+        assert lines[1] == MALFORMED_LINE
+        assert json.loads(lines[0])["timestamp"].startswith("2026-01-01T21:33:00")
+
+
+def _convert(client, headers=None, **extra):
+    body = {"agent": "claude", "session_path": str(CLAUDE_FIXTURE), "format": "player", **extra}
+    return client.post("/api/convert", json=body, headers=headers or {})
+
+
+class TestConvertGzip:
+    def test_gzip_only_when_accepted(self, client):
+        plain = _convert(client)
+        zipped = _convert(client, headers={"Accept-Encoding": "gzip"})
+        assert plain.headers.get("Content-Encoding") is None
+        assert zipped.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(zipped.data) == plain.data
+
+    def test_compressed_body_kept_with_memo_entry(self, client):
+        _convert(client, headers={"Accept-Encoding": "gzip"})
+        [entry] = web_ui._render_memo.values()
+        assert gzip.decompress(entry["gzip"]).decode("utf-8") == entry["content"]
+
+    def test_small_documents_are_not_compressed(self, client):
+        resp = _convert(client, headers={"Accept-Encoding": "gzip"}, format="md")
+        assert resp.headers.get("Content-Encoding") is None
+
+
+class TestRenderOptionValidation:
+    @pytest.mark.parametrize("spec", ["1", "1-50", "53-", "-10", "1-50,53-", "1, 3 ,5-7", None, ""])
+    def test_accepted_ranges(self, spec):
+        assert web_ui._invalid_render_option("md", "light", spec) is None
+
+    @pytest.mark.parametrize("spec", ["-", "1,,3", ",1", "1,", "1--3", "1-2-3", "a-b", "1 - 3", 5])
+    def test_rejected_ranges(self, spec):
+        assert web_ui._invalid_render_option("md", "light", spec) == f"Invalid range: {spec}"
+
+    def test_rejected_format_and_theme(self):
+        assert web_ui._invalid_render_option("pdf") == "Invalid format: pdf"
+        assert web_ui._invalid_render_option("html", "dark") == "Invalid theme: dark"
+
+
+class TestRenderBatch:
+    def _batch(self, client, **body):
+        body = {"agent": "claude", "session_path": str(CLAUDE_FIXTURE), **body}
+        return client.post("/api/render/batch", json=body)
+
+    def test_each_format_matches_single_convert(self, client):
+        resp = self._batch(client, formats=["md", "html", "player", "terminal"], theme="console")
+        assert resp.status_code == 200
+        contents = resp.get_json()["contents"]
+        # jsonify (the fallback without orjson) sorts keys, so order is not checked
+        assert set(contents) == {"md", "html", "player", "terminal"}
+        for fmt, content in contents.items():
+            single = _convert(client, format=fmt, theme="console")
+            assert single.data.decode("utf-8") == content
+
+    def test_duplicate_formats_rendered_once(self, client):
+        resp = self._batch(client, formats=["md", "md"])
+        assert list(resp.get_json()["contents"]) == ["md"]
+
+    def test_invalid_format_in_list(self, client):
+        resp = self._batch(client, formats=["md", "pdf"])
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "Invalid format: pdf"
+
+    def test_formats_must_be_a_list(self, client):
+        assert self._batch(client, formats="md").status_code == 400
+
+    def test_missing_path(self, client):
+        resp = client.post("/api/render/batch", json={"agent": "claude", "formats": ["md"]})
+        assert resp.status_code == 400
+
+    def test_nonexistent_session(self, client, tmp_path):
+        resp = self._batch(client, formats=["md"], session_path=str(tmp_path / "nope.jsonl"))
+        assert resp.status_code == 500
+        assert resp.get_json()["error"].startswith("Log conversion failed")
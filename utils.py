@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Small helpers shared by the TUI, the web UI and the video/GIF exporters."""
+
+import time
+from functools import lru_cache
+
+SIZE_UNITS = "BKMGT"
+
+# True once the play button is back to "play" and the last message is visible
+PLAYBACK_DONE_JS = """([btnSel, lastSel]) => {
+    const b = document.querySelector(btnSel);
+    const l = document.querySelector(lastSel);
+    return !!b && (b.textContent || "").trim() === "play"
+        && !!l && getComputedStyle(l).display !== "none";
+}"""
+
+
+@lru_cache(maxsize=4096)
+def format_size(size_bytes):
+    """Format bytes to human-readable size (e.g. 512B, 1.5KB, 12MB)."""
+    size_bytes = int(size_bytes)
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    exp = min((size_bytes.bit_length() - 1) // 10, 4)
+    value = f"{size_bytes / (1 << (exp * 10)):.1f}".rstrip("0").rstrip(".")
+    return value + SIZE_UNITS[exp] + "B"
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute):
+    t = time.localtime(minute * 60)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}"
+
+
+def format_mtime(mtime):
+    """Format a timestamp as local "YYYY-MM-DD HH:MM"; "" if it is out of range."""
+    try:
+        return _format_minute(int(mtime) // 60)
+    except (OSError, OverflowError, ValueError):
+        return ""
@@ -1,17 +1,33 @@
 #!/usr/bin/env python3
 """Web UI for Claude Session Replay."""
 
+import gzip
 import os
+import re
 import sys
 import json
-import subprocess
+import shutil
 import tempfile
 import time
+import threading
 import importlib.util
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
 from flask import Flask, render_template, jsonify, request, send_file, send_from_directory, Response
 
+import model_cache
+import preview_cache
+from utils import format_mtime, format_size
+
+try:
+    # Optional: faster JSONL/model parsing and large JSON responses
+    from orjson import loads as _json_loads, dumps as _json_dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = None
+
 # Import log2model modules
 def _import_module(name, filepath):
     spec = importlib.util.spec_from_file_location(name, filepath)
@@ -20,238 +36,294 @@ def _import_module(name, filepath):
     return module
 
 script_dir = Path(__file__).parent
-claude_log2model = _import_module("claude_log2model", str(script_dir / "claude-log2model.py"))
-codex_log2model = _import_module("codex_log2model", str(script_dir / "codex-log2model.py"))
-gemini_log2model = _import_module("gemini_log2model", str(script_dir / "gemini-log2model.py"))
-aider_log2model = _import_module("aider_log2model", str(script_dir / "aider-log2model.py"))
-cursor_log2model = _import_module("cursor_log2model", str(script_dir / "cursor-log2model.py"))
+
+# Render options accepted by the web endpoints, checked before any conversion work
+RENDER_FORMATS = ("md", "html", "player", "terminal")
+RENDER_THEMES = ("light", "console")
+# "1-50,53-": N, N-M, N- or -M parts joined by single commas (spaces allowed around parts)
+_RANGE_PART = r"\s*(?:\d+(?:-\d*)?|-\d+)\s*"
+_RANGE_RE = re.compile(_RANGE_PART + "(?:," + _RANGE_PART + ")*")
+
+# Short-lived scratch files (edited JSONL for apply-to-output) go on tmpfs when available
+SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Preview extraction is I/O-bound, so threads overlap the file reads
+PREVIEW_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Models of recently converted sessions, so re-rendering with another
+# format/theme/range skips log2model.  Keyed by (agent, path, mtime_ns, size).
+MODEL_MEMO_SIZE = 16
+_model_memo = OrderedDict()
+# Rendered documents for /api/convert, keyed by the log's identity plus the
+# render options; switching back to a format/theme just rendered is a lookup
+RENDER_MEMO_SIZE = 8
+_render_memo = OrderedDict()
+_memo_lock = threading.Lock()
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max
 
 
-def _format_size(size_bytes):
-    """Format bytes to human-readable size."""
-    for unit in ("B", "KB", "MB", "GB"):
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f}{unit}".replace(".0", "")
-        size_bytes /= 1024
-    return f"{size_bytes:.1f}TB".replace(".0", "")
+def _memo_get(memo, key):
+    with _memo_lock:
+        value = memo.get(key)
+        if value is not None:
+            memo.move_to_end(key)
+        return value
 
 
-def _has_tool_blocks(content):
-    """Check if content has tool_use or tool_result blocks."""
-    if isinstance(content, str):
-        return False
-    if isinstance(content, list):
-        for block in content:
-            if isinstance(block, dict) and block.get("type") in ("tool_use", "tool_result"):
-                return True
-    return False
+def _memo_put(memo, key, value, size):
+    with _memo_lock:
+        memo[key] = value
+        while len(memo) > size:
+            memo.popitem(last=False)
 
 
-def _extract_thinking_from_content(content):
-    """Extract thinking blocks from content list."""
-    if not isinstance(content, list):
-        return []
-    return [block.get("thinking", "") for block in content
-            if isinstance(block, dict) and block.get("type") == "thinking"]
+def _session_key(session_path, agent):
+    """Identity of a session log: changes whenever the file is rewritten."""
+    st = os.stat(session_path)
+    return (agent, os.path.abspath(session_path), st.st_mtime_ns, st.st_size)
 
 
-def _extract_tool_uses_from_content(content):
-    """Extract tool_use blocks from content list."""
-    if not isinstance(content, list):
-        return []
-    return [block for block in content
-            if isinstance(block, dict) and block.get("type") == "tool_use"]
+def _load_model(session_path, agent, key=None):
+    """Return the model for session_path, reusing it while the log is unchanged."""
+    key = key or _session_key(session_path, agent)
+    model = _memo_get(_model_memo, key)
+    if model is None:
+        model = model_cache.cached_model(session_path, agent)
+        _memo_put(_model_memo, key, model, MODEL_MEMO_SIZE)
+    return model
 
 
-def _extract_tool_results_from_content(content):
-    """Extract tool_result blocks from content list."""
-    if not isinstance(content, list):
-        return []
-    return [block for block in content
-            if isinstance(block, dict) and block.get("type") == "tool_result"]
+def _classify_content(content):
+    """Split a content block list into (thinking, tool_uses, tool_results, has_tools) in one pass."""
+    thinking, tool_uses, tool_results = [], [], []
+    if isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            block_type = block.get("type")
+            if block_type == "thinking":
+                thinking.append(block.get("thinking", ""))
+            elif block_type == "tool_use":
+                tool_uses.append(block)
+            elif block_type == "tool_result":
+                tool_results.append(block)
+    return thinking, tool_uses, tool_results, bool(tool_uses or tool_results)
+
+
+def _editor_claude_user(data, line_idx, messages):
+    message = data.get("message", {})
+    content = message.get("content", "")
+    _, _, tool_results, has_tools = _classify_content(content)
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "user",
+        "role": message.get("role", ""),
+        "text": model_cache.load_adapter("claude")._extract_text_from_content(content) or "",
+        "thinking": [],
+        "tool_results": tool_results,
+        "hasTools": has_tools,
+        "isReadOnly": False
+    })
+
+
+def _editor_claude_assistant(data, line_idx, messages):
+    message = data.get("message", {})
+    content = message.get("content", "")
+    thinking, tool_uses, tool_results, has_tools = _classify_content(content)
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "assistant",
+        "role": message.get("role", ""),
+        "text": model_cache.load_adapter("claude")._extract_text_from_content(content) or "",
+        "thinking": thinking,
+        "tool_uses": tool_uses,
+        "tool_results": tool_results,
+        "hasTools": has_tools,
+        "isReadOnly": False
+    })
+
+
+def _editor_claude_progress(data, line_idx, messages):
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "progress",
+        "role": "progress",
+        "text": data.get("message", ""),
+        "thinking": [],
+        "hasTools": False,
+        "isReadOnly": True
+    })
+
+
+def _editor_claude_file_history(data, line_idx, messages):
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "file-history",
+        "role": "file-history",
+        "text": f"File snapshot: {len(data.get('paths', []))} files",
+        "thinking": [],
+        "hasTools": False,
+        "isReadOnly": True
+    })
+
+
+def _editor_codex_user_event(data, line_idx, messages):
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "user",
+        "role": "user",
+        "text": data["payload"].get("message", "") or "",
+        "thinking": [],
+        "tool_results": [],
+        "hasTools": False,
+        "isReadOnly": False
+    })
+
+
+def _editor_codex_agent_event(data, line_idx, messages):
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": "assistant",
+        "role": "assistant",
+        "text": data["payload"].get("message", "") or "",
+        "thinking": [],
+        "hasTools": False,
+        "isReadOnly": False
+    })
+
+
+def _editor_codex_response(data, line_idx, messages):
+    payload = data["payload"]
+    role = payload.get("role", "")
+    if role not in ("user", "assistant"):
+        return
+    content = payload.get("content", [])
+    _, tool_uses, tool_results, has_tools = _classify_content(content)
+    codex = model_cache.load_adapter("codex")
+    messages.append({
+        "idx": len(messages) + 1,
+        "lineIdx": line_idx,
+        "blockType": role,
+        "role": role,
+        "text": codex._extract_text_from_codex_content(content) or "",
+        "thinking": codex._extract_thinking_from_codex_content(content),
+        "tool_uses": tool_uses,
+        "tool_results": tool_results,
+        "hasTools": has_tools,
+        "isReadOnly": False
+    })
+
+
+# Editor entry builders, looked up once per line instead of walking an if/elif chain.
+# Claude is keyed by record type, Codex by (record type, payload type) for the file's mode.
+_CLAUDE_EDITOR_HANDLERS = {
+    "user": _editor_claude_user,
+    "assistant": _editor_claude_assistant,
+    "progress": _editor_claude_progress,
+    "file-history-snapshot": _editor_claude_file_history,
+}
+_CODEX_EVENT_HANDLERS = {
+    ("event_msg", "user_message"): _editor_codex_user_event,
+    ("event_msg", "agent_message"): _editor_codex_agent_event,
+}
+_CODEX_RESPONSE_HANDLERS = {
+    ("response_item", "message"): _editor_codex_response,
+}
 
 
 def _extract_all_messages_for_editor(jsonl_path, agent):
     """Extract all messages with line indices for editor."""
     messages = []
     try:
-        with open(jsonl_path, "r", encoding="utf-8") as f:
-            for line_idx, line in enumerate(f):
-                try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+        # Codex logs carry either event_msg or response_item messages; decide once per file
+        use_event_msgs = agent == "codex" and model_cache.load_adapter("codex")._codex_has_event_messages(jsonl_path)
+        codex_handlers = _CODEX_EVENT_HANDLERS if use_event_msgs else _CODEX_RESPONSE_HANDLERS
 
-                if agent == "claude":
-                    record_type = data.get("type", "")
+        # Binary lines go straight to the parser (orjson takes bytes without a decode step)
+        for line_idx, line in enumerate(_iter_jsonl_lines(jsonl_path)):
+            try:
+                data = _json_loads(line)
+            except json.JSONDecodeError:
+                continue
 
-                    if record_type == "user":
-                        message = data.get("message", {})
-                        role = message.get("role", "")
-                        content = message.get("content", "")
-                        text = claude_log2model._extract_text_from_content(content)
-                        tool_results = _extract_tool_results_from_content(content)
-                        has_tools = _has_tool_blocks(content)
+            handler = None
+            if agent == "claude":
+                handler = _CLAUDE_EDITOR_HANDLERS.get(data.get("type", ""))
 
-                        messages.append({
-                            "idx": len(messages) + 1,
-                            "lineIdx": line_idx,
-                            "blockType": "user",
-                            "role": role,
-                            "text": text or "",
-                            "thinking": [],
-                            "tool_results": tool_results,
-                            "hasTools": has_tools,
-                            "isReadOnly": False
-                        })
+            elif agent == "codex":
+                payload_type = data.get("payload", {}).get("type", "")
+                handler = codex_handlers.get((data.get("type", ""), payload_type))
+
+            elif agent == "gemini":
+                # Gemini is single JSON, not JSONL
+                with open(jsonl_path, "r", encoding="utf-8") as gf:
+                    gemini_data = json.load(gf)
+                    gemini = model_cache.load_adapter("gemini")
+                    for idx, msg in enumerate(gemini_data.get("messages", [])):
+                        m_type = msg.get("type", "")
+                        if m_type == "user":
+                            role = "user"
+                        elif m_type == "gemini":
+                            role = "assistant"
+                        else:
+                            continue
 
-                    elif record_type == "assistant":
-                        message = data.get("message", {})
-                        role = message.get("role", "")
-                        content = message.get("content", "")
-                        text = claude_log2model._extract_text_from_content(content)
-                        thinking = _extract_thinking_from_content(content)
-                        tool_uses = _extract_tool_uses_from_content(content)
-                        tool_results = _extract_tool_results_from_content(content)
-                        has_tools = _has_tool_blocks(content)
+                        text = gemini._extract_text_from_content(msg.get("content", ""))
+                        thinking = [t.get("description", "") for t in msg.get("thoughts", [])]
 
                         messages.append({
                             "idx": len(messages) + 1,
-                            "lineIdx": line_idx,
-                            "blockType": "assistant",
+                            "lineIdx": idx,  # For gemini, this is the index in messages list
+                            "blockType": role,
                             "role": role,
                             "text": text or "",
                             "thinking": thinking,
-                            "tool_uses": tool_uses,
-                            "tool_results": tool_results,
-                            "hasTools": has_tools,
-                            "isReadOnly": False
-                        })
-
-                    elif record_type == "progress":
-                        messages.append({
-                            "idx": len(messages) + 1,
-                            "lineIdx": line_idx,
-                            "blockType": "progress",
-                            "role": "progress",
-                            "text": data.get("message", ""),
-                            "thinking": [],
+                            "tool_uses": [],
+                            "tool_results": [],
                             "hasTools": False,
-                            "isReadOnly": True
-                        })
-
-                    elif record_type == "file-history-snapshot":
-                        messages.append({
-                            "idx": len(messages) + 1,
-                            "lineIdx": line_idx,
-                            "blockType": "file-history",
-                            "role": "file-history",
-                            "text": f"File snapshot: {len(data.get('paths', []))} files",
-                            "thinking": [],
-                            "hasTools": False,
-                            "isReadOnly": True
+                            "isReadOnly": False
                         })
+                break  # Stop the outer loop
 
-                elif agent == "codex":
-                    record_type = data.get("type", "")
-                    payload = data.get("payload", {})
-                    payload_type = payload.get("type", "")
-
-                    # Check if codex has event_messages mode
-                    use_event_msgs = codex_log2model._codex_has_event_messages(jsonl_path)
-
-                    if use_event_msgs and record_type == "event_msg":
-                        if payload_type == "user_message":
-                            text = payload.get("message", "")
-                            messages.append({
-                                "idx": len(messages) + 1,
-                                "lineIdx": line_idx,
-                                "blockType": "user",
-                                "role": "user",
-                                "text": text or "",
-                                "thinking": [],
-                                "tool_results": [],
-                                "hasTools": False,
-                                "isReadOnly": False
-                            })
-                        elif payload_type == "agent_message":
-                            text = payload.get("message", "")
-                            messages.append({
-                                "idx": len(messages) + 1,
-                                "lineIdx": line_idx,
-                                "blockType": "assistant",
-                                "role": "assistant",
-                                "text": text or "",
-                                "thinking": [],
-                                "hasTools": False,
-                                "isReadOnly": False
-                            })
-                    elif not use_event_msgs and record_type == "response_item":
-                        if payload_type == "message":
-                            role = payload.get("role", "")
-                            if role not in ("user", "assistant"):
-                                continue
-                            content = payload.get("content", [])
-                            text = codex_log2model._extract_text_from_codex_content(content)
-                            thinking = codex_log2model._extract_thinking_from_codex_content(content)
-                            tool_uses = _extract_tool_uses_from_content(content)
-                            tool_results = _extract_tool_results_from_content(content)
-                            has_tools = _has_tool_blocks(content)
-
-                            messages.append({
-                                "idx": len(messages) + 1,
-                                "lineIdx": line_idx,
-                                "blockType": role,
-                                "role": role,
-                                "text": text or "",
-                                "thinking": thinking,
-                                "tool_uses": tool_uses,
-                                "tool_results": tool_results,
-                                "hasTools": has_tools,
-                                "isReadOnly": False
-                            })
-
-                elif agent == "gemini":
-                    # Gemini is single JSON, not JSONL
-                    with open(jsonl_path, "r", encoding="utf-8") as gf:
-                        gemini_data = json.load(gf)
-                        for idx, msg in enumerate(gemini_data.get("messages", [])):
-                            m_type = msg.get("type", "")
-                            if m_type == "user":
-                                role = "user"
-                            elif m_type == "gemini":
-                                role = "assistant"
-                            else:
-                                continue
-
-                            text = gemini_log2model._extract_text_from_content(msg.get("content", ""))
-                            thinking = [t.get("description", "") for t in msg.get("thoughts", [])]
-
-                            messages.append({
-                                "idx": len(messages) + 1,
-                                "lineIdx": idx,  # For gemini, this is the index in messages list
-                                "blockType": role,
-                                "role": role,
-                                "text": text or "",
-                                "thinking": thinking,
-                                "tool_uses": [],
-                                "tool_results": [],
-                                "hasTools": False,
-                                "isReadOnly": False
-                            })
-                    break  # Stop the outer loop
+            if handler:
+                handler(data, line_idx, messages)
     except (OSError, UnicodeDecodeError):
         pass
 
     return messages
 
 
-def _update_jsonl_text(line_data, agent, new_text):
-    """Update text in a jsonl line record. Returns modified record."""
-    data = dict(line_data)  # shallow copy
+@lru_cache(maxsize=64)
+def _cached_editor_messages(jsonl_path, mtime_ns, size, agent):
+    return _extract_all_messages_for_editor(jsonl_path, agent)
+
+
+def _editor_messages(jsonl_path, agent):
+    """Editor messages for a session, re-extracted only when the file changes.
+
+    The returned list is shared between requests and must not be mutated.
+    """
+    try:
+        st = os.stat(jsonl_path)
+    except OSError:
+        return []
+    return _cached_editor_messages(jsonl_path, st.st_mtime_ns, st.st_size, agent)
+
+
+def _update_jsonl_text(data, agent, new_text):
+    """Update text in a parsed jsonl line record in place. Returns the record.
+
+    Nested message/payload dicts were always edited in place, so callers pass
+    a freshly parsed record they own; no copy is made.
+    """
 
     if agent == "claude":
         message = data.get("message", {})
@@ -290,19 +362,24 @@ def _update_jsonl_text(line_data, agent, new_text):
     return data
 
 
-def _apply_alibai_offset(model_path, alibai_time):
-    """Apply Alibai time offset to model timestamps (UTC-based)."""
-    from datetime import datetime, timedelta
-
-    # Parse alibai_time (HH:MM format)
+def _parse_alibai_time(alibai_time):
+    """Split "HH:MM" into (hour, minute); ValueError if it is not a valid clock time."""
     try:
         h, m = map(int, alibai_time.split(':'))
-    except:
+    except (AttributeError, ValueError):
+        h = m = -1
+    if not (0 <= h < 24 and 0 <= m < 60):
         raise ValueError("Invalid time format. Use HH:MM (e.g., 21:33)")
+    return h, m
+
+
+def _alibai_time_shift(model, alibai_time):
+    """Seconds that move the model's first timestamp to HH:MM (UTC) on the same day.
 
-    # Load model
-    with open(model_path, 'r', encoding='utf-8') as f:
-        model = json.load(f)
+    The renderer applies the shift while rendering (time_shift / --time-shift),
+    so the model is never rewritten.  Returns 0 when there is nothing to shift.
+    """
+    h, m = _parse_alibai_time(alibai_time)
 
     # Find first timestamp
     first_timestamp = None
@@ -313,33 +390,64 @@ def _apply_alibai_offset(model_path, alibai_time):
 
     if not first_timestamp:
         # No timestamps in model, nothing to do
-        return
+        return 0
 
-    # Parse first timestamp (already in UTC)
-    try:
-        first_dt = datetime.fromisoformat(first_timestamp.replace('Z', '+00:00'))
-    except:
-        return
+    # Target: same date as first message, but with specified time (in UTC)
+    offset_us = model_cache.load_renderer().clock_offset_us(first_timestamp, h, m)
+    return 0 if offset_us is None else offset_us / 1e6
 
-    # Create target datetime: same date as first message, but with specified time (in UTC)
-    alibai_dt = first_dt.replace(hour=h, minute=m, second=0, microsecond=0)
 
-    # Calculate offset (in UTC)
-    offset = alibai_dt - first_dt
+def _dump_line(record):
+    """Serialize one JSONL record to compact UTF-8 bytes."""
+    if _json_dumps is None:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _json_dumps(record)
 
-    # Apply offset to all timestamps
-    for msg in model.get("messages", []):
-        if msg.get("timestamp"):
-            try:
-                ts_dt = datetime.fromisoformat(msg["timestamp"].replace('Z', '+00:00'))
-                new_ts = (ts_dt + offset).isoformat().replace('+00:00', '') + 'Z'
-                msg["timestamp"] = new_ts
-            except:
-                pass
 
-    # Save modified model
-    with open(model_path, 'w', encoding='utf-8') as f:
-        json.dump(model, f)
+JSONL_READ_CHUNK = 1 << 20
+
+
+def _iter_jsonl_lines(path):
+    """Yield the lines of a JSONL file as bytes, without line endings.
+
+    Reads through a large binary buffer, so there is no per-line decode; the
+    bytes go straight to _json_loads.
+    """
+    with open(path, "rb", buffering=JSONL_READ_CHUNK) as f:
+        for line in f:
+            yield line.rstrip(b"\r\n")
+
+
+def _json_response(payload):
+    """Serialize a large response body with orjson when available, else jsonify."""
+    if _json_dumps is None:
+        return jsonify(payload)
+    return Response(_json_dumps(payload), mimetype='application/json')
+
+
+# Rendered documents at least this large are gzipped for clients that accept it
+GZIP_MIN_SIZE = 16 * 1024
+# Rendered HTML repeats the same markup per message, so level 1 already compresses well
+GZIP_LEVEL = 1
+
+
+def _rendered_response(content, format_type, memo_entry=None):
+    """Return rendered output as the raw response body, gzipped when the client accepts it.
+
+    memo_entry is the document's _render_memo entry; its compressed body is
+    kept there so a memoized document is gzipped only once.
+    """
+    mimetype = 'text/html' if format_type in ("html", "player") else 'text/plain'
+    headers = {"X-Replay-Format": format_type, "Vary": "Accept-Encoding"}
+    if len(content) >= GZIP_MIN_SIZE and "gzip" in request.accept_encodings:
+        headers["Content-Encoding"] = "gzip"
+        body = memo_entry.get("gzip") if memo_entry else None
+        if body is None:
+            body = gzip.compress(content.encode("utf-8"), compresslevel=GZIP_LEVEL)
+            if memo_entry:
+                memo_entry["gzip"] = body
+        return Response(body, mimetype=mimetype, headers=headers)
+    return Response(content, mimetype=mimetype, headers=headers)
 
 
 @app.route('/')
@@ -354,38 +462,20 @@ def index():
 def get_sessions(agent):
     """Get list of sessions for agent."""
     try:
-        if agent == "claude":
-            sessions = claude_log2model.discover_sessions()
-        elif agent == "codex":
-            sessions = codex_log2model.discover_sessions()
-        elif agent == "gemini":
-            sessions = gemini_log2model.discover_sessions()
-        elif agent == "aider":
-            sessions = aider_log2model.discover_sessions()
-        elif agent == "cursor":
-            sessions = cursor_log2model.discover_sessions()
-        else:
+        # Adapters are loaded on first use and shared with model_cache
+        adapter = model_cache.load_adapter(agent)
+        if adapter is None:
             return jsonify({"error": "Invalid agent"}), 400
 
-        session_list = []
-        for session in sessions:
-            if agent == "claude":
-                preview = claude_log2model._extract_preview(session["path"])
-            elif agent == "codex":
-                use_event_msgs = codex_log2model._codex_has_event_messages(session["path"])
-                preview = codex_log2model._extract_preview(session["path"], use_event_msgs)
-            elif agent == "gemini":
-                preview = gemini_log2model._extract_preview(session["path"])
-            elif agent == "aider":
-                preview = aider_log2model._extract_preview(session["path"])
-            elif agent == "cursor":
-                preview = cursor_log2model._extract_preview(session["path"])
+        sessions = adapter.discover_sessions()
+        previews = preview_cache.load_previews(agent, sessions, adapter._extract_preview, PREVIEW_WORKERS)
 
+        session_list = []
+        for session, preview in zip(sessions, previews):
             total = preview.get("user_count", 0) + preview.get("assistant_count", 0)
             if total > 0:
                 mtime = session.get("mtime", 0)
-                dt = datetime.fromtimestamp(mtime)
-                date_str = dt.strftime("%Y-%m-%d %H:%M")
+                date_str = format_mtime(mtime)
 
                 first_msg = preview.get("first_message", "")[:80]
                 project = session.get("project", first_msg or "Unknown")
@@ -396,11 +486,11 @@ def get_sessions(agent):
                     "size": session.get("size", 0),
                     "mtime": mtime,
                     "date_str": date_str,
-                    "size_str": _format_size(session.get("size", 0)),
+                    "size_str": format_size(session.get("size", 0)),
                     "first_message": first_msg,
                 })
 
-        return jsonify({"sessions": session_list})
+        return _json_response({"sessions": session_list})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -419,65 +509,53 @@ def get_preview(agent):
             return jsonify({"error": "Invalid agent"}), 400
 
         # Use editor-content to get ALL messages for preview
-        messages = _extract_all_messages_for_editor(session_path, agent)
+        messages = _editor_messages(session_path, agent)
 
-        preview_text = ""
+        # Collect lines and join once; repeated += copies the whole preview each time
+        parts = []
         for msg in messages:
             # Get block type for label
             block_type = msg.get("blockType", msg.get("role", "unknown")).upper()
-            preview_text += f"#{msg['idx']} [{block_type}]"
-
             # Add hasTools badge if present
-            if msg.get("hasTools"):
-                preview_text += " 🔧"
-
-            preview_text += "\n"
+            badge = " 🔧" if msg.get("hasTools") else ""
+            parts.append(f"#{msg['idx']} [{block_type}]{badge}\n")
 
             # Show thinking blocks if present
-            thinking = msg.get("thinking", [])
-            if thinking:
-                for i, thought in enumerate(thinking):
-                    if thought.strip():
-                        thought_preview = thought.strip()[:100].replace("\n", " ")
-                        if len(thought.strip()) > 100:
-                            thought_preview += "..."
-                        preview_text += f"  💭 思考: {thought_preview}\n"
+            for thought in msg.get("thinking", []):
+                thought = thought.strip()
+                if thought:
+                    thought_preview = thought[:100].replace("\n", " ")
+                    if len(thought) > 100:
+                        thought_preview += "..."
+                    parts.append(f"  💭 思考: {thought_preview}\n")
 
             # Show tool_uses if present
-            tool_uses = msg.get("tool_uses", [])
-            if tool_uses:
-                for tool_use in tool_uses:
-                    tool_name = tool_use.get("name", "Unknown")
-                    preview_text += f"  🔧 {tool_name}\n"
+            for tool_use in msg.get("tool_uses", []):
+                parts.append(f"  🔧 {tool_use.get('name', 'Unknown')}\n")
 
             # Show tool_results if present
-            tool_results = msg.get("tool_results", [])
-            if tool_results:
-                for result in tool_results:
-                    result_content = result.get("content", "")
-                    if isinstance(result_content, str):
-                        preview_text += f"  📋 Result: {result_content[:100]}\n"
+            for result in msg.get("tool_results", []):
+                result_content = result.get("content", "")
+                if isinstance(result_content, str):
+                    parts.append(f"  📋 Result: {result_content[:100]}\n")
 
             # Show text or blockType-specific info
-            if msg.get("blockType") == "progress":
-                # Progress messages: show with icon
-                if msg["text"]:
-                    preview_text += f"  ⏳ {msg['text'][:150]}\n"
-            elif msg.get("blockType") == "file-history":
-                # File-history messages: show with icon
-                if msg["text"]:
-                    preview_text += f"  📁 {msg['text'][:150]}\n"
-            else:
-                # User/Assistant messages: show text
-                if msg["text"]:
+            if msg["text"]:
+                if msg.get("blockType") == "progress":
+                    parts.append(f"  ⏳ {msg['text'][:150]}\n")
+                elif msg.get("blockType") == "file-history":
+                    parts.append(f"  📁 {msg['text'][:150]}\n")
+                else:
+                    # User/Assistant messages: show text
                     text = msg["text"][:200].replace("\n", " ")
                     if len(msg["text"]) > 200:
                         text += "..."
-                    preview_text += f"  {text}\n"
+                    parts.append(f"  {text}\n")
 
-            preview_text += "\n"
+            parts.append("\n")
+        preview_text = "".join(parts)
 
-        return jsonify({"preview": preview_text})
+        return _json_response({"preview": preview_text})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -495,13 +573,50 @@ def get_editor_content(agent):
         if agent not in ("claude", "codex"):
             return jsonify({"error": "Invalid agent"}), 400
 
-        messages = _extract_all_messages_for_editor(session_path, agent)
-        return jsonify({"messages": messages})
+        messages = _editor_messages(session_path, agent)
+        return _json_response({"messages": messages})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@contextmanager
+def _scratch_path(data):
+    """Yield a path holding data; the file is gone when the block exits.
+
+    On Linux this is an unnamed O_TMPFILE inode reached through /proc/self/fd,
+    so there is no directory entry to create, unlink, or leak on a crash.
+    """
+    scratch_dir = SCRATCH_DIR or tempfile.gettempdir()
+    try:
+        fd = os.open(scratch_dir, os.O_TMPFILE | os.O_RDWR, 0o600)
+    except (AttributeError, OSError):
+        fd = None
+    if fd is not None and not os.path.isdir("/proc/self/fd"):
+        os.close(fd)
+        fd = None
+
+    if fd is not None:
+        try:
+            with open(fd, "wb", closefd=False) as f:
+                f.write(data)
+            yield f"/proc/self/fd/{fd}"
+        finally:
+            os.close(fd)
+        return
+
+    fd, path = tempfile.mkstemp(prefix="edited-", suffix=".jsonl", dir=scratch_dir)
+    try:
+        with open(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 @app.route('/api/apply-to-output', methods=['POST'])
 def apply_to_output():
     """Apply edits to a temp jsonl and convert."""
@@ -524,143 +639,72 @@ def apply_to_output():
         if not all([agent, session_path, format_type]):
             return jsonify({"error": "Missing required parameters"}), 400
 
+        error = _invalid_render_option(format_type, theme, range_filter)
+        if error:
+            return jsonify({"error": error}), 400
+
         # Create a mapping of lineIdx -> edit
         edits_map = {e["lineIdx"]: e for e in edits}
 
         # Read original jsonl and apply edits
         edited_lines = []
         try:
-            with open(session_path, "r", encoding="utf-8") as f:
-                for line_idx, line in enumerate(f):
-                    if line_idx in edits_map:
-                        edit = edits_map[line_idx]
-                        if edit.get("deleted"):
-                            continue  # Skip deleted lines
-
-                        # Parse and update text
-                        try:
-                            record = json.loads(line.strip())
-                            record = _update_jsonl_text(record, agent, edit.get("text", ""))
-                            edited_lines.append(json.dumps(record))
-                        except json.JSONDecodeError:
-                            edited_lines.append(line.strip())
-                    else:
+            for line_idx, line in enumerate(_iter_jsonl_lines(session_path)):
+                edit = edits_map.get(line_idx)
+                if edit is not None:
+                    if edit.get("deleted"):
+                        continue  # Skip deleted lines
+
+                    # Parse and update text
+                    try:
+                        record = _json_loads(line)
+                        record = _update_jsonl_text(record, agent, edit.get("text", ""))
+                        edited_lines.append(_dump_line(record))
+                    except json.JSONDecodeError:
                         edited_lines.append(line.strip())
+                else:
+                    edited_lines.append(line.strip())
         except Exception as e:
             return jsonify({"error": f"Failed to read session: {str(e)}"}), 500
 
-        # Write to temp jsonl
-        fd, temp_jsonl = tempfile.mkstemp(prefix="edited-", suffix=".jsonl")
-        try:
-            os.write(fd, "\n".join(edited_lines).encode("utf-8"))
-            os.close(fd)
-
-            # Create temporary model file
-            fd_model, model_path = tempfile.mkstemp(prefix="log-model-", suffix=".json")
-            os.close(fd_model)
+        if agent not in ("claude", "codex", "gemini"):
+            return jsonify({"error": "Invalid agent"}), 400
 
+        # The adapters read from a path, so the edited lines still go through
+        # one scratch jsonl; the model and the rendered output stay in memory
+        with _scratch_path(b"\n".join(edited_lines)) as temp_jsonl:
             try:
-                # Convert edited jsonl to model
-                if agent == "claude":
-                    log2model = "claude-log2model.py"
-                elif agent == "codex":
-                    log2model = "codex-log2model.py"
-                elif agent == "gemini":
-                    log2model = "gemini-log2model.py"
-                else:
-                    return jsonify({"error": "Invalid agent"}), 400
-
-                log_cmd = [sys.executable, str(script_dir / log2model), temp_jsonl, "-o", model_path]
-                result = subprocess.run(log_cmd, capture_output=True, text=True, timeout=60)
-
-                # Log stderr for debugging
-                if result.stderr:
-                    print(result.stderr, file=sys.stderr, flush=True)
-                    with open("/tmp/renderer_debug.log", "a") as f:
-                        f.write(f"=== {datetime.now()} ===\n{result.stderr}\n")
-
-                if result.returncode != 0:
-                    return jsonify({"error": f"Log conversion failed: {result.stderr}"}), 500
-
-                # Apply Alibai time offset if specified
-                if alibai_time and format_type == "player":
-                    try:
-                        _apply_alibai_offset(model_path, alibai_time)
-                    except Exception as e:
-                        return jsonify({"error": f"Alibai time error: {str(e)}"}), 500
-
-                # Render to temp file
-                fd_render, render_output_path = tempfile.mkstemp(suffix=f".{format_type}")
-                os.close(fd_render)
+                model = model_cache.build_model(temp_jsonl, agent)
+            except Exception as e:
+                return jsonify({"error": f"Log conversion failed: {e}"}), 500
 
-                try:
-                    render_cmd = [
-                        sys.executable, str(script_dir / "log-model-renderer.py"), model_path,
-                        "-f", format_type,
-                        "-t", theme or "light",
-                        "-o", render_output_path
-                    ]
-
-                    if range_filter:
-                        render_cmd.extend(["-r", range_filter])
-
-                    # Add filters as JSON
-                    if filters:
-                        filters_json = json.dumps(filters)
-                        render_cmd.extend(["--filters", filters_json])
-
-                    # Add truncate length (0 = no truncate)
-                    if truncate_length is None:
-                        render_cmd.extend(["--truncate", "0"])
-                    else:
-                        render_cmd.extend(["--truncate", str(truncate_length)])
-
-                    result = subprocess.run(render_cmd, capture_output=True, text=True, timeout=60)
-
-                    # Log stderr for debugging
-                    if result.stderr:
-                        print(result.stderr, file=sys.stderr, flush=True)
-                        with open("/tmp/renderer_debug.log", "a") as f:
-                            f.write(f"=== {datetime.now()} ===\n{result.stderr}\n")
-
-                    if result.returncode != 0:
-                        return jsonify({"error": f"Rendering failed: {result.stderr}"}), 500
-
-                    # Read output
-                    with open(render_output_path, 'r', encoding='utf-8') as f:
-                        output_content = f.read()
-
-                    return jsonify({
-                        "success": True,
-                        "format": format_type,
-                        "content": output_content
-                    })
-
-                finally:
-                    try:
-                        os.remove(render_output_path)
-                    except:
-                        pass
+        # Alibai time offset is applied while rendering
+        time_shift = 0
+        if alibai_time and format_type == "player":
+            try:
+                time_shift = _alibai_time_shift(model, alibai_time)
+            except Exception as e:
+                return jsonify({"error": f"Alibai time error: {str(e)}"}), 500
 
-            finally:
-                try:
-                    os.remove(model_path)
-                except:
-                    pass
+        # Render in-process (0 = no truncate)
+        try:
+            output_content = model_cache.load_renderer().render(
+                model, format_type, session_path,
+                theme=theme or "light",
+                range_spec=range_filter or None,
+                filters=filters or None,
+                truncate_length=0 if truncate_length is None else int(truncate_length),
+                time_shift=time_shift,
+            )
+        except Exception as e:
+            return jsonify({"error": f"Rendering failed: {e}"}), 500
 
-        finally:
-            try:
-                os.remove(temp_jsonl)
-            except:
-                pass
+        return _rendered_response(output_content, format_type)
 
-    except subprocess.TimeoutExpired:
-        return jsonify({"error": "Conversion timeout"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/apply-to-session-log', methods=['POST'])
 def _create_backup(file_path):
     """Create a backup of the file with numbered naming.
 
@@ -680,10 +724,8 @@ def _create_backup(file_path):
         # First backup is just "backup.jsonl"
         backup_path = parent / f"{stem}.backup{suffix}"
         if not backup_path.exists():
-            # Copy file to backup location
-            with open(path, 'rb') as src:
-                with open(backup_path, 'wb') as dst:
-                    dst.write(src.read())
+            # Copy file to backup location (kernel-side copy, no full read into memory)
+            shutil.copyfile(path, backup_path)
             return str(backup_path)
 
         # If backup exists, find the next numbered backup
@@ -691,9 +733,7 @@ def _create_backup(file_path):
         while True:
             numbered_backup = parent / f"{stem}.backup.{counter}{suffix}"
             if not numbered_backup.exists():
-                with open(path, 'rb') as src:
-                    with open(numbered_backup, 'wb') as dst:
-                        dst.write(src.read())
+                shutil.copyfile(path, numbered_backup)
                 return str(numbered_backup)
             counter += 1
     except Exception as e:
@@ -701,6 +741,7 @@ def _create_backup(file_path):
         return None
 
 
+@app.route('/api/apply-to-session-log', methods=['POST'])
 def apply_to_session_log():
     """Apply edits directly to the original jsonl file."""
     try:
@@ -716,28 +757,33 @@ def apply_to_session_log():
         # Create a mapping of lineIdx -> edit
         edits_map = {e["lineIdx"]: e for e in edits}
 
-        # Read original jsonl, apply edits, and collect all records
+        # Read original jsonl and apply edits.  Entries are parsed records for
+        # edited lines and raw bytes for untouched ones, which are written back
+        # verbatim; every line is parsed only when Alibai rewrites timestamps.
+        # Lines that are not valid JSON are kept as they are either way.
         edited_records = []
         try:
-            with open(session_path, "r", encoding="utf-8") as f:
-                for line_idx, line in enumerate(f):
-                    if line_idx in edits_map:
-                        edit = edits_map[line_idx]
-                        if edit.get("deleted"):
-                            continue  # Skip deleted lines
-
-                        try:
-                            record = json.loads(line.strip())
-                            record = _update_jsonl_text(record, agent, edit.get("text", ""))
-                            edited_records.append(record)
-                        except json.JSONDecodeError:
-                            pass
-                    else:
-                        try:
-                            record = json.loads(line.strip())
-                            edited_records.append(record)
-                        except json.JSONDecodeError:
-                            pass
+            for line_idx, line in enumerate(_iter_jsonl_lines(session_path)):
+                edit = edits_map.get(line_idx)
+                if edit is None and not alibai_time:
+                    if line.strip():
+                        edited_records.append(line)
+                    continue
+                if edit is not None and edit.get("deleted"):
+                    continue  # Skip deleted lines
+
+                try:
+                    record = _json_loads(line)
+                except json.JSONDecodeError:
+                    if line.strip():
+                        edited_records.append(line)
+                    continue
+                if not isinstance(record, dict):
+                    edited_records.append(line)
+                    continue
+                if edit is not None:
+                    record = _update_jsonl_text(record, agent, edit.get("text", ""))
+                edited_records.append(record)
         except Exception as e:
             return jsonify({"error": f"Failed to read session: {str(e)}"}), 500
 
@@ -747,37 +793,27 @@ def apply_to_session_log():
                 # Find first timestamp
                 first_timestamp = None
                 for record in edited_records:
-                    ts = record.get("timestamp")
+                    ts = record.get("timestamp") if isinstance(record, dict) else None
                     if ts:
                         first_timestamp = ts
                         break
 
                 if first_timestamp:
-                    # Parse alibai_time
                     try:
-                        h, m = map(int, alibai_time.split(':'))
-                    except:
+                        h, m = _parse_alibai_time(alibai_time)
+                    except ValueError:
                         return jsonify({"error": "Invalid time format. Use HH:MM"}), 400
 
-                    # Parse first timestamp
-                    try:
-                        first_dt = datetime.fromisoformat(first_timestamp.replace('Z', '+00:00'))
-                    except:
+                    renderer = model_cache.load_renderer()
+                    offset_us = renderer.clock_offset_us(first_timestamp, h, m)
+                    if offset_us is None:
                         return jsonify({"error": "Cannot parse timestamps"}), 400
 
-                    # Calculate offset
-                    alibai_dt = first_dt.replace(hour=h, minute=m, second=0, microsecond=0)
-                    offset = alibai_dt - first_dt
-
-                    # Apply offset to all timestamps
+                    # Apply offset to all timestamps (integer microsecond math in the renderer)
                     for record in edited_records:
-                        if record.get("timestamp"):
-                            try:
-                                ts_dt = datetime.fromisoformat(record["timestamp"].replace('Z', '+00:00'))
-                                new_ts = (ts_dt + offset).isoformat().replace('+00:00', '') + 'Z'
-                                record["timestamp"] = new_ts
-                            except:
-                                pass
+                        ts = record.get("timestamp") if isinstance(record, dict) else None
+                        if ts and isinstance(ts, str):
+                            record["timestamp"] = renderer.shift_timestamp_us(ts, offset_us)
 
             except Exception as e:
                 return jsonify({"error": f"Alibai time error: {str(e)}"}), 500
@@ -787,9 +823,13 @@ def apply_to_session_log():
 
         # Write back to original file
         try:
-            with open(session_path, "w", encoding="utf-8") as f:
-                for record in edited_records:
-                    f.write(json.dumps(record) + "\n")
+            # Serialize everything first, then write once
+            payload = b"".join(
+                (record if isinstance(record, bytes) else _dump_line(record)) + b"\n"
+                for record in edited_records
+            )
+            with open(session_path, "wb") as f:
+                f.write(payload)
 
             message = f"Session log updated: {session_path}"
             if backup_path:
@@ -807,6 +847,76 @@ def apply_to_session_log():
         return jsonify({"error": str(e)}), 500
 
 
+_made_dirs = set()
+
+
+def _ensure_dir(directory):
+    """mkdir -p, skipped for directories this process has already created."""
+    if directory in _made_dirs:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    with _memo_lock:
+        _made_dirs.add(directory)
+
+
+def _invalid_render_option(format_type, theme=None, range_filter=None):
+    """Return an error message for an unsupported format/theme/range, else None."""
+    if format_type not in RENDER_FORMATS:
+        return f"Invalid format: {format_type}"
+    if theme and theme not in RENDER_THEMES:
+        return f"Invalid theme: {theme}"
+    if range_filter and not (isinstance(range_filter, str) and _RANGE_RE.fullmatch(range_filter)):
+        return f"Invalid range: {range_filter}"
+    return None
+
+
+def _render_cached(session_path, agent, format_type, theme=None, range_filter=None,
+                   alibai_time=None, truncate_length=None):
+    """Render a session log, reusing the memoized output for identical options.
+
+    Returns the _render_memo entry, {"content": str, "gzip": bytes or None}.
+    Raises RuntimeError with a user-facing message when a stage fails.
+    """
+    try:
+        session_key = _session_key(session_path, agent)
+    except OSError as e:
+        raise RuntimeError(f"Log conversion failed: {e}")
+
+    render_key = session_key + (format_type, theme, range_filter, alibai_time, truncate_length)
+    entry = _memo_get(_render_memo, render_key)
+    if entry is not None:
+        return entry
+
+    # Step 1: Convert to model (in-process, reused across re-renders)
+    try:
+        model = _load_model(session_path, agent, session_key)
+    except Exception as e:
+        raise RuntimeError(f"Log conversion failed: {e}")
+
+    # Alibai time offset is applied while rendering
+    time_shift = 0
+    if alibai_time and format_type == "player":
+        try:
+            time_shift = _alibai_time_shift(model, alibai_time)
+        except Exception as e:
+            raise RuntimeError(f"Alibai time error: {str(e)}")
+
+    # Step 2: Render (0 = no truncate)
+    try:
+        output_content = model_cache.load_renderer().render(
+            model, format_type, session_path,
+            theme=theme or "light",
+            range_spec=range_filter or None,
+            truncate_length=0 if truncate_length is None else int(truncate_length),
+            time_shift=time_shift,
+        )
+    except Exception as e:
+        raise RuntimeError(f"Rendering failed: {e}")
+    entry = {"content": output_content, "gzip": None}
+    _memo_put(_render_memo, render_key, entry, RENDER_MEMO_SIZE)
+    return entry
+
+
 @app.route('/api/convert', methods=['POST'])
 def convert():
     """Convert and render session."""
@@ -824,118 +934,76 @@ def convert():
         if not all([agent, session_path, format_type]):
             return jsonify({"error": "Missing required parameters"}), 400
 
-        # Create temporary model file
-        fd, model_path = tempfile.mkstemp(prefix="log-model-", suffix=".json")
-        os.close(fd)
-
-        try:
-            # Step 1: Convert to model
-            if agent == "claude":
-                log2model = "claude-log2model.py"
-            elif agent == "codex":
-                log2model = "codex-log2model.py"
-            elif agent == "gemini":
-                log2model = "gemini-log2model.py"
-            else:
-                return jsonify({"error": "Invalid agent"}), 400
-
-            log_cmd = [sys.executable, str(script_dir / log2model), session_path, "-o", model_path]
-            result = subprocess.run(log_cmd, capture_output=True, text=True, timeout=60)
+        if agent not in ("claude", "codex", "gemini"):
+            return jsonify({"error": "Invalid agent"}), 400
 
-            # Log stderr for debugging
-            if result.stderr:
-                print(result.stderr, file=sys.stderr, flush=True)
-                with open("/tmp/renderer_debug.log", "a") as f:
-                    f.write(f"=== {datetime.now()} ===\n{result.stderr}\n")
+        error = _invalid_render_option(format_type, theme, range_filter)
+        if error:
+            return jsonify({"error": error}), 400
 
-            if result.returncode != 0:
-                return jsonify({"error": f"Log conversion failed: {result.stderr}"}), 500
+        try:
+            entry = _render_cached(session_path, agent, format_type, theme,
+                                   range_filter, alibai_time, truncate_length)
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 500
+        output_content = entry["content"]
+
+        # If output file is requested, write it
+        if output_path:
+            output_file = Path(output_path)
+            _ensure_dir(output_file.parent)
+            try:
+                output_file.write_text(output_content, encoding="utf-8")
+            except FileNotFoundError:
+                # The directory was removed since we created it
+                _made_dirs.discard(output_file.parent)
+                _ensure_dir(output_file.parent)
+                output_file.write_text(output_content, encoding="utf-8")
+            return jsonify({
+                "success": True,
+                "message": f"Output saved to {output_path}",
+                "download_url": f"/api/download/{output_file.name}"
+            })
 
-            # Apply Alibai time offset if specified
-            if alibai_time and format_type == "player":
-                try:
-                    _apply_alibai_offset(model_path, alibai_time)
-                except Exception as e:
-                    return jsonify({"error": f"Alibai time error: {str(e)}"}), 500
+        # Otherwise, return the rendered document itself
+        return _rendered_response(output_content, format_type, entry)
 
-            # Step 2: Render to temp file
-            fd, render_output_path = tempfile.mkstemp(suffix=f".{format_type}")
-            os.close(fd)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-            try:
-                render_cmd = [
-                    sys.executable, str(script_dir / "log-model-renderer.py"), model_path,
-                    "-f", format_type,
-                    "-t", theme or "light",
-                    "-o", render_output_path
-                ]
-
-                if range_filter:
-                    render_cmd.extend(["-r", range_filter])
-
-                # Add truncate length (0 = no truncate)
-                if truncate_length is None:
-                    render_cmd.extend(["--truncate", "0"])
-                else:
-                    render_cmd.extend(["--truncate", str(truncate_length)])
 
-                # Run renderer
-                result = subprocess.run(render_cmd, capture_output=True, text=True, timeout=60)
 
-                # Log stderr for debugging
-                if result.stderr:
-                    print(result.stderr, file=sys.stderr, flush=True)
-                    with open("/tmp/renderer_debug.log", "a") as f:
-                        f.write(f"=== {datetime.now()} ===\n{result.stderr}\n")
+@app.route('/api/render/batch', methods=['POST'])
+def render_batch():
+    """Render one session in several formats; the model is converted once."""
+    try:
+        data = request.json
+        agent = data.get("agent")
+        session_path = data.get("session_path")
+        formats = data.get("formats")
 
-                if result.returncode != 0:
-                    return jsonify({"error": f"Rendering failed: {result.stderr}"}), 500
+        if not all([agent, session_path, formats]) or not isinstance(formats, list):
+            return jsonify({"error": "Missing required parameters"}), 400
 
-                # Read generated output
-                with open(render_output_path, 'r', encoding='utf-8') as f:
-                    output_content = f.read()
-            finally:
-                # Cleanup render output temp file
-                try:
-                    os.remove(render_output_path)
-                except:
-                    pass
-
-            # If output file is requested, write it
-            if output_path:
-                output_file = Path(output_path)
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-                output_file.write_text(output_content)
-                return jsonify({
-                    "success": True,
-                    "message": f"Output saved to {output_path}",
-                    "download_url": f"/api/download/{output_file.name}"
-                })
+        if agent not in ("claude", "codex", "gemini"):
+            return jsonify({"error": "Invalid agent"}), 400
 
-            # Otherwise, return content based on format
-            if format_type in ["html", "player"]:
-                return jsonify({
-                    "success": True,
-                    "format": format_type,
-                    "content": output_content
-                })
-            else:
-                # For md and terminal, return as text
-                return jsonify({
-                    "success": True,
-                    "format": format_type,
-                    "content": output_content
-                })
+        for format_type in formats:
+            error = _invalid_render_option(format_type, data.get("theme"), data.get("range"))
+            if error:
+                return jsonify({"error": error}), 400
 
-        finally:
-            # Cleanup temp model file
+        contents = {}
+        for format_type in dict.fromkeys(formats):
             try:
-                os.remove(model_path)
-            except:
-                pass
+                contents[format_type] = _render_cached(
+                    session_path, agent, format_type, data.get("theme"), data.get("range"),
+                    data.get("alibai_time"), data.get("truncate_length"))["content"]
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 500
+
+        return _json_response({"success": True, "contents": contents})
 
-    except subprocess.TimeoutExpired:
-        return jsonify({"error": "Conversion timeout"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 